@@ -1,15 +1,25 @@
 import os
-import requests
-import time
+import asyncio
+import aiohttp
+import aiofiles
+from aiolimiter import AsyncLimiter
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+try:
+    import orjson as _json  # 优先使用orjson，解析速度更快
+except ImportError:
+    import json as _json
+
 load_dotenv() # 从 .env 文件加载环境变量
 
 # 在这里直接设置你的Pexels API密钥
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY") # 替换为你的实际API密钥
+MAX_CONCURRENT_DOWNLOADS = 10  # 同时下载的图片数量
+DOWNLOADS_PER_SECOND = 2  # 每秒最多发起的下载请求数，避免请求过于频繁
+DOWNLOAD_CHUNK_SIZE = 1 << 17  # 每次读取128 KB，减少Python层循环次数
 
-def search_and_download_images(query, per_page=10, download_folder="pexels_downloads"):
+async def search_and_download_images(query, per_page=10, download_folder="pexels_downloads"):
     """
     从Pexels搜索并下载图片
     
@@ -19,13 +29,11 @@ def search_and_download_images(query, per_page=10, download_folder="pexels_downl
         download_folder (str): 下载图片的保存文件夹
     """
     # 创建下载文件夹
-    if not os.path.exists(download_folder):
-        os.makedirs(download_folder)
+    os.makedirs(download_folder, exist_ok=True)
     
     # 创建特定关键词的子文件夹
     query_folder = os.path.join(download_folder, query.replace(" ", "_"))
-    if not os.path.exists(query_folder):
-        os.makedirs(query_folder)
+    os.makedirs(query_folder, exist_ok=True)
     
     # Pexels API搜索端点
     url = "https://api.pexels.com/v1/search"
@@ -43,67 +51,69 @@ def search_and_download_images(query, per_page=10, download_folder="pexels_downl
     }
     
     try:
-        # 发送API请求
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # 检查请求是否成功
-        
-        data = response.json()
-        
-        if "photos" not in data or len(data["photos"]) == 0:
-            print(f"未找到与 '{query}' 相关的图片。")
-            return
-        
-        total_photos = len(data["photos"])
-        print(f"找到 {total_photos} 张与 '{query}' 相关的图片，开始下载...")
-        
-        # 下载图片
-        for i, photo in enumerate(data["photos"]):
-            image_url = photo["src"]["original"]
-            photographer = photo["photographer"]
-            photo_id = photo["id"]
+        async with aiohttp.ClientSession() as session:
+            # 发送API请求
+            async with session.get(url, headers=headers, params=params) as response:
+                response.raise_for_status()  # 检查请求是否成功
+                data = _json.loads(await response.read())
+            
+            if "photos" not in data or len(data["photos"]) == 0:
+                print(f"未找到与 '{query}' 相关的图片。")
+                return
             
-            # 构建文件名
-            file_extension = image_url.split("?")[0].split(".")[-1]
-            filename = f"{photo_id}_{photographer.replace(' ', '_')}.{file_extension}"
-            file_path = os.path.join(query_folder, filename)
+            total_photos = len(data["photos"])
+            print(f"找到 {total_photos} 张与 '{query}' 相关的图片，开始下载...")
             
-            # 下载图片
-            print(f"正在下载图片 {i+1}/{total_photos}: {filename}")
-            download_image(image_url, file_path)
+            # 并发下载图片：信号量限制同时进行的下载数，限流器控制请求速率
+            sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+            limiter = AsyncLimiter(DOWNLOADS_PER_SECOND, 1)
+            tasks = []
+            for i, photo in enumerate(data["photos"]):
+                image_url = photo["src"]["original"]
+                photographer = photo["photographer"]
+                photo_id = photo["id"]
+                
+                # 构建文件名
+                file_extension = image_url.split("?")[0].split(".")[-1]
+                filename = f"{photo_id}_{photographer.replace(' ', '_')}.{file_extension}"
+                file_path = os.path.join(query_folder, filename)
+                
+                print(f"加入下载队列 {i+1}/{total_photos}: {filename}")
+                tasks.append(download_image(session, image_url, file_path, sem, limiter))
             
-            # 避免请求过于频繁
-            time.sleep(0.5)
+            results = await asyncio.gather(*tasks)
         
-        print(f"\n下载完成！图片已保存到 '{query_folder}' 文件夹")
+        print(f"\n下载完成！成功 {sum(results)}/{total_photos} 张，图片已保存到 '{query_folder}' 文件夹")
         
-    except requests.exceptions.RequestException as e:
+    except aiohttp.ClientError as e:
         print(f"请求错误: {e}")
     except Exception as e:
         print(f"发生错误: {e}")
 
-def download_image(url, file_path):
+async def download_image(session, url, file_path, sem, limiter):
     """下载图片并显示进度条"""
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        block_size = 1024  # 1 KB
-        
-        with open(file_path, 'wb') as file, tqdm(
-            desc="下载进度",
-            total=total_size,
-            unit='B',
-            unit_scale=True,
-            unit_divisor=1024,
-        ) as bar:
-            for data in response.iter_content(block_size):
-                bar.update(len(data))
-                file.write(data)
+        async with sem, limiter, session.get(url) as response:
+            response.raise_for_status()
+            
+            total_size = int(response.headers.get('content-length', 0))
+            
+            async with aiofiles.open(file_path, 'wb') as file:
+                with tqdm(
+                    desc=os.path.basename(file_path),
+                    total=total_size,
+                    unit='B',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    leave=False,
+                ) as bar:
+                    async for data in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        bar.update(len(data))
+                        await file.write(data)
                 
         return True
     except Exception as e:
-        print(f"下载图片时出错: {e}")
+        print(f"下载图片 {os.path.basename(file_path)} 时出错: {e}")
         return False
 
 def main():
@@ -119,7 +129,7 @@ def main():
         per_page = input("请输入要下载的图片数量 (默认10): ")
         per_page = int(per_page) if per_page.isdigit() else 10
         
-        search_and_download_images(query, per_page)
+        asyncio.run(search_and_download_images(query, per_page))
 
 if __name__ == "__main__":
     main()
@@ -3,19 +3,55 @@
 
 import os
 import requests
+import shutil
 import time
 import sys
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 from urllib.parse import quote
 from dotenv import load_dotenv
 
+try:
+    import orjson as _json  # 优先使用orjson，解析速度更快
+except ImportError:
+    import json as _json
+
 load_dotenv() # 从 .env 文件加载环境变量
 
 # 用户配置 - 直接在这里修改
 API_KEY = os.getenv("PEXELS_API_KEY")  # 替换为你的Pexels API密钥
 ORIENTATION = "portrait"  # 视频方向: "landscape"(横屏) 或 "portrait"(竖屏)
 OUTPUT_DIRECTORY = "videos"  # 相对于当前目录的文件夹名称
-DOWNLOAD_DELAY = 5  # 每个视频下载后的等待时间(秒)
+DOWNLOAD_DELAY = 5  # 相邻两次视频下载之间的最小间隔(秒)
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 每次拷贝1 MB，拷贝循环在C层完成
+
+class RateLimiter:
+    """令牌桶限流器：只有在请求速率超出限制时才会等待"""
+    
+    def __init__(self, rate, period=1.0):
+        """每 period 秒最多允许 rate 次请求"""
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.last_refill = time.monotonic()
+    
+    def acquire(self):
+        """取得一个令牌，返回实际等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.fill_rate)
+        self.last_refill = now
+        
+        wait = 0.0
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+            self.tokens = 1.0
+            self.last_refill = time.monotonic()
+        
+        self.tokens -= 1
+        return wait
 
 class PexelsVideoDownloader:
     def __init__(self, api_key):
@@ -26,6 +62,12 @@ class PexelsVideoDownloader:
         }
         self.base_url = "https://api.pexels.com/videos/search"
         
+        # 复用同一个会话（HTTP keep-alive + 连接池），避免每次请求都重新建立TCP/TLS连接
+        # 对429及网关错误自动退避重试
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries))
+        
     def search_videos(self, query, per_page=10, page=1, orientation=None):
         """搜索视频"""
         # 对查询词进行URL编码，确保多词查询和特殊字符正确处理
@@ -42,9 +84,9 @@ class PexelsVideoDownloader:
             params['orientation'] = orientation
             
         try:
-            response = requests.get(self.base_url, headers=self.headers, params=params)
+            response = self.session.get(self.base_url, headers=self.headers, params=params)
             response.raise_for_status()  # 如果响应包含错误状态码，则引发异常
-            return response.json()
+            return _json.loads(response.content)
         except requests.exceptions.RequestException as e:
             print(f"搜索视频时出错: {e}")
             return None
@@ -52,25 +94,24 @@ class PexelsVideoDownloader:
     def download_video(self, video_url, save_path):
         """下载视频"""
         try:
-            response = requests.get(video_url, stream=True)
+            response = self.session.get(video_url, stream=True)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', 0))
-            block_size = 1024  # 1 KB
             
-            with open(save_path, 'wb') as file, tqdm(
+            # 直接从底层连接拷贝到文件，绕过 iter_content 的逐块生成开销
+            # decode_content 保证 gzip 等传输编码仍会被正确解码
+            response.raw.decode_content = True
+            with open(save_path, 'wb') as file, tqdm.wrapattr(
+                file, 'write',
                 desc=os.path.basename(save_path),
                 total=total_size,
-                unit='B',
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for data in response.iter_content(block_size):
-                    file.write(data)
-                    bar.update(len(data))
+            ) as wrapped_file:
+                shutil.copyfileobj(response.raw, wrapped_file, length=DOWNLOAD_CHUNK_SIZE)
                     
             return True
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, Urllib3HTTPError, OSError) as e:
+            # 直接读取 response.raw 时，连接中断等urllib3异常不会被requests包装
             print(f"下载视频时出错: {e}")
             if os.path.exists(save_path):
                 os.remove(save_path)  # 删除可能部分下载的文件
@@ -83,17 +124,17 @@ class PexelsVideoDownloader:
         
         # 创建输出目录（相对于当前目录）
         full_output_dir = os.path.join(current_dir, output_dir)
-        if not os.path.exists(full_output_dir):
-            os.makedirs(full_output_dir)
+        os.makedirs(full_output_dir, exist_ok=True)
             
         # 将查询词转换为合法的文件夹名称
         safe_query = "".join([c if c.isalnum() else "_" for c in query])
         query_dir = os.path.join(full_output_dir, safe_query)
-        if not os.path.exists(query_dir):
-            os.makedirs(query_dir)
+        os.makedirs(query_dir, exist_ok=True)
             
         downloaded = 0
         page = 1
+        # 限制下载频率以避免API速率限制和IP封禁；上一个下载耗时已超过间隔时不再额外等待
+        limiter = RateLimiter(1, DOWNLOAD_DELAY)
         
         print(f"搜索关键词: '{query}'")
         print(f"视频方向: {orientation}")
@@ -119,12 +160,11 @@ class PexelsVideoDownloader:
                     break
                     
                 # 获取最高质量的视频文件
-                video_files = sorted(video['video_files'], key=lambda x: x.get('height', 0) * x.get('width', 0), reverse=True)
+                best_video = max(video['video_files'], key=lambda x: x.get('height', 0) * x.get('width', 0), default=None)
                 
-                if not video_files:
+                if best_video is None:
                     continue
                     
-                best_video = video_files[0]
                 video_url = best_video['link']
                 
                 # 创建文件名
@@ -139,17 +179,16 @@ class PexelsVideoDownloader:
                 filename = f"{safe_query}_{video['id']}_{resolution}.{file_ext}"
                 save_path = os.path.join(query_dir, filename)
                 
+                waited = limiter.acquire()
+                if waited:
+                    print(f"已等待 {waited:.1f} 秒以避免请求过于频繁")
+                
                 print(f"\n下载视频 {downloaded+1}/{count}: {filename}")
                 if self.download_video(video_url, save_path):
                     downloaded += 1
                     print(f"成功下载: {filename}")
                 else:
                     print(f"下载失败: {filename}")
-                    
-                # 添加延迟以避免API速率限制和IP封禁
-                if downloaded < count:
-                    print(f"等待 {DOWNLOAD_DELAY} 秒后继续下载...")
-                    time.sleep(DOWNLOAD_DELAY)
                 
             page += 1
             
@@ -2,28 +2,42 @@ import os
 import sys
 import random
 import string
-import mimetypes
-from qiniu import Auth, put_file, etag
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from qiniu import Auth, put_data, put_file, etag
 import qiniu.config
 import time
 from dotenv import load_dotenv
 
 load_dotenv() # 加载 .env 文件中的环境变量
 
+# 并发上传的线程数，上传主要在等待网络，线程数可以远大于CPU核数
+MAX_UPLOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 需要上传的图片扩展名
+IMG_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff', '.heic'})
+
 def generate_random_string(length=10):
     """生成指定长度的随机字符串"""
     letters = string.ascii_lowercase + string.digits
     return ''.join(random.choice(letters) for _ in range(length))
 
 def is_image_file(filename):
-    """判断文件是否为图片"""
-    mime_type, _ = mimetypes.guess_type(filename)
-    return mime_type and mime_type.startswith('image/')
+    """判断文件是否为图片（按扩展名判断）"""
+    return os.path.splitext(filename)[1].lower() in IMG_EXTS
 
-def upload_to_qiniu(local_file, key, access_key, secret_key, bucket_name, domain):
-    """上传文件到七牛云"""
-    # 构建鉴权对象
-    q = Auth(access_key, secret_key)
+def iter_image_files(root):
+    """递归遍历目录，逐个返回图片文件路径"""
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_image_files(entry.path)
+            elif entry.is_file() and is_image_file(entry.name):
+                yield entry.path
+
+def upload_to_qiniu(local_file, key, q, bucket_name, domain):
+    """上传文件到七牛云（q 为共享的鉴权对象）"""
+    basename = os.path.basename(local_file)
     
     # 生成上传 Token，可以指定过期时间等
     token = q.upload_token(bucket_name, key, 3600)
@@ -31,40 +45,50 @@ def upload_to_qiniu(local_file, key, access_key, secret_key, bucket_name, domain
     print(f"正在上传: {local_file} -> {key}")
     
     # 上传文件
+    local_size = os.path.getsize(local_file)
     start_time = time.time()
-    ret, info = put_file(token, key, local_file, version='v2')
+    # 不超过SDK表单上传阈值的小文件通过内存映射直接上传，
+    # 更大的文件仍使用可断点续传、按块重试的分片上传
+    if 0 < local_size <= qiniu.config.get_default('default_upload_threshold'):
+        # 内存映射文件并以memoryview交给SDK，省去一次Python层的读取拷贝
+        with open(local_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            ret, info = put_data(token, key, view, fname=basename)
+    else:
+        ret, info = put_file(token, key, local_file, version='v2')
     end_time = time.time()
     
     if info.status_code == 200:
         # 返回文件的访问链接
         url = f"http://{domain}/{key}"
-        file_size = os.path.getsize(local_file) / 1024  # KB
+        file_size = local_size / 1024  # KB
         upload_time = end_time - start_time
         speed = file_size / upload_time if upload_time > 0 else 0
         
-        print(f"✅ 上传成功: {os.path.basename(local_file)}")
-        print(f"   大小: {file_size:.2f} KB")
-        print(f"   耗时: {upload_time:.2f} 秒")
-        print(f"   速度: {speed:.2f} KB/s")
-        print(f"   链接: {url}")
-        print("-" * 80)
+        # 多线程上传时一次性输出，避免不同文件的信息交错
+        print("\n".join([
+            f"✅ 上传成功: {basename}",
+            f"   大小: {file_size:.2f} KB",
+            f"   耗时: {upload_time:.2f} 秒",
+            f"   速度: {speed:.2f} KB/s",
+            f"   链接: {url}",
+            "-" * 80,
+        ]))
         
         return url
     else:
-        print(f"❌ 上传失败: {os.path.basename(local_file)}")
-        print(f"   错误信息: {info}")
-        print("-" * 80)
+        print("\n".join([
+            f"❌ 上传失败: {basename}",
+            f"   错误信息: {info}",
+            "-" * 80,
+        ]))
         return None
 
 def upload_images_in_directory(directory, access_key, secret_key, bucket_name, domain, output_file):
     """上传目录中的所有图片"""
     # 获取所有图片文件
-    image_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if is_image_file(file_path):
-                image_files.append(file_path)
+    image_files = list(iter_image_files(directory))
     
     total_files = len(image_files)
     print(f"找到 {total_files} 个图片文件待上传")
@@ -73,16 +97,32 @@ def upload_images_in_directory(directory, access_key, secret_key, bucket_name, d
     successful_uploads = 0
     failed_uploads = 0
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for index, file_path in enumerate(image_files, 1):
-            # 生成随机文件名，保留原始扩展名
-            _, ext = os.path.splitext(file_path)
-            random_name = generate_random_string(16) + ext
-            
+    # 鉴权对象只需构建一次，所有上传线程共享
+    q = Auth(access_key, secret_key)
+    
+    # 提交前预先生成随机文件名，保留原始扩展名
+    random_names = {}
+    for file_path in image_files:
+        ext = os.path.splitext(file_path)[1]
+        random_names[file_path] = generate_random_string(16) + ext
+    
+    with open(output_file, 'w', encoding='utf-8') as f, \
+            ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+        # 并发上传到七牛云
+        futures = {
+            executor.submit(upload_to_qiniu, file_path, random_names[file_path], q, bucket_name, domain): file_path
+            for file_path in image_files
+        }
+        
+        # 结果在主线程中按完成顺序写入，无需额外加锁
+        for index, future in enumerate(as_completed(futures), 1):
             print(f"[{index}/{total_files}] 进度: {index/total_files*100:.2f}%")
             
-            # 上传到七牛云
-            url = upload_to_qiniu(file_path, random_name, access_key, secret_key, bucket_name, domain)
+            try:
+                url = future.result()
+            except Exception as e:
+                print(f"❌ 上传出错: {os.path.basename(futures[future])}: {e}")
+                url = None
             
             if url:
                 f.write(f"{url}\n")
@@ -2,18 +2,28 @@ import os
 import pandas as pd
 from openpyxl import Workbook, load_workbook
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from openpyxl.utils import get_column_letter
 
+# 并发读取txt文件的线程数
+READ_WORKERS = 8
+# 同时提交（已读取但尚未写入）的文件数上限，避免写入跟不上时内容堆积在内存中
+READ_WINDOW = READ_WORKERS * 4
+
+def iter_txt_files(root):
+    """递归遍历目录，逐个返回txt文件路径（直接使用scandir缓存的文件类型，减少stat调用）"""
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_txt_files(entry.path)
+            elif entry.is_file() and entry.name.lower().endswith('.txt'):
+                yield entry.path
+
 def collect_txt_files(folder_path):
     """收集指定文件夹及其子文件夹中的所有txt文件"""
     print(f"开始扫描文件夹: {folder_path}")
-    txt_files = []
-    
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith('.txt'):
-                full_path = os.path.join(root, file)
-                txt_files.append(full_path)
+    txt_files = list(iter_txt_files(folder_path))
                 
     print(f"扫描完成，共找到 {len(txt_files)} 个txt文件")
     return txt_files
@@ -35,59 +45,60 @@ def read_txt_content(file_path):
     except Exception as e:
         return f"读取文件时出错: {str(e)}"
 
-def create_excel_if_not_exists(output_excel):
-    """如果Excel文件不存在，则创建一个新的带有标题行的Excel文件"""
-    if not os.path.exists(output_excel):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "TXT文件内容"
-        
-        # 添加标题行
-        headers = ['文件名', '相对路径', '文件内容']
-        ws.append(headers)
-        
-        # 调整列宽
-        ws.column_dimensions['A'].width = 30  # 文件名
-        ws.column_dimensions['B'].width = 50  # 相对路径
-        ws.column_dimensions['C'].width = 100  # 文件内容
-        
-        wb.save(output_excel)
-        print(f"创建了新的Excel文件: {output_excel}")
+def new_workbook():
+    """创建一个只写（流式）工作簿，并写入标题行"""
+    # write_only 模式下每一行直接写入xlsx，不在内存中保留单元格对象
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("TXT文件内容")
+    
+    # 调整列宽（只写模式下必须在写入行之前设置）
+    ws.column_dimensions['A'].width = 30  # 文件名
+    ws.column_dimensions['B'].width = 50  # 相对路径
+    ws.column_dimensions['C'].width = 100  # 文件内容
+    
+    # 添加标题行
+    headers = ['文件名', '相对路径', '文件内容']
+    ws.append(headers)
+    return wb, ws
 
 def process_and_save_files(txt_files, output_excel, folder_path):
-    """逐个处理txt文件并保存到Excel"""
+    """处理txt文件并流式写入Excel"""
     print("开始处理文件内容...")
     start_time = time.time()
     total_files = len(txt_files)
     
-    # 创建Excel文件（如果不存在）
-    create_excel_if_not_exists(output_excel)
+    wb, ws = new_workbook()
     
     # 记录已处理的文件，避免重复处理
     processed_files = set()
     
-    try:
-        # 检查是否有已处理的文件
-        if os.path.exists(output_excel):
-            wb = load_workbook(output_excel)
-            ws = wb.active
-            
-            # 从第2行开始（跳过标题行）
-            for row in range(2, ws.max_row + 1):
-                file_path = ws.cell(row=row, column=2).value
-                if file_path:
-                    processed_files.add(file_path)
+    if os.path.exists(output_excel):
+        try:
+            # 以只读模式流式读取已有结果，并原样转存到新的工作簿中
+            old_wb = load_workbook(output_excel, read_only=True)
+            try:
+                for row in old_wb.active.iter_rows(min_row=2, max_col=3, values_only=True):
+                    ws.append(row)
+                    if row[1]:
+                        processed_files.add(row[1])
+            finally:
+                old_wb.close()
             
             print(f"检测到已处理 {len(processed_files)} 个文件")
-    except Exception as e:
-        print(f"读取已有Excel文件时出错: {str(e)}")
-        print("将创建新的Excel文件")
-        create_excel_if_not_exists(output_excel)
+        except Exception as e:
+            # 无法完整读取已有结果时直接退出，避免新工作簿覆盖原文件
+            print(f"读取已有Excel文件时出错: {str(e)}")
+            print("为避免覆盖已有结果，已停止处理，请检查该文件或更换输出路径")
+            return
+    else:
+        print(f"将创建新的Excel文件: {output_excel}")
     
     # 处理文件
     success_count = 0
     error_count = 0
     
+    # 先过滤掉已处理过的文件
+    pending_files = []
     for index, file_path in enumerate(txt_files, 1):
         relative_path = os.path.relpath(file_path, start=folder_path)
         
@@ -95,31 +106,48 @@ def process_and_save_files(txt_files, output_excel, folder_path):
         if relative_path in processed_files:
             print(f"跳过已处理的文件 ({index}/{total_files}): {os.path.basename(file_path)}")
             continue
+        pending_files.append((index, file_path, relative_path))
+    
+    try:
+        # 多线程并发读取文件，主线程按原顺序取回内容并写入Excel；
+        # 最多只提前提交 READ_WINDOW 个读取任务，保持内存占用有界
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            pending_iter = iter(pending_files)
+            in_flight = deque()
             
-        print(f"正在处理文件 ({index}/{total_files}): {os.path.basename(file_path)}")
-        
-        try:
-            # 读取文件内容
-            content = read_txt_content(file_path)
-            file_name = os.path.basename(file_path)
-            
-            # 加载当前Excel
-            wb = load_workbook(output_excel)
-            ws = wb.active
-            
-            # 添加新行
-            new_row = [file_name, relative_path, content]
-            ws.append(new_row)
+            def submit_next():
+                item = next(pending_iter, None)
+                if item is not None:
+                    in_flight.append((item, executor.submit(read_txt_content, item[1])))
             
-            # 保存Excel
-            wb.save(output_excel)
-            success_count += 1
-            print(f"  ✓ 成功处理并保存: {file_name}")
+            for _ in range(READ_WINDOW):
+                submit_next()
             
-        except Exception as e:
-            error_count += 1
-            print(f"  ✗ 处理文件时出错: {file_path}")
-            print(f"    错误信息: {str(e)}")
+            while in_flight:
+                (index, file_path, relative_path), future = in_flight.popleft()
+                content = future.result()
+                submit_next()
+                
+                print(f"正在处理文件 ({index}/{total_files}): {os.path.basename(file_path)}")
+                
+                try:
+                    file_name = os.path.basename(file_path)
+                    
+                    # 添加新行
+                    ws.append([file_name, relative_path, content])
+                    success_count += 1
+                    print(f"  ✓ 成功处理: {file_name}")
+                    
+                except Exception as e:
+                    error_count += 1
+                    print(f"  ✗ 处理文件时出错: {file_path}")
+                    print(f"    错误信息: {str(e)}")
+    finally:
+        # 只写工作簿只能保存一次：无论正常结束还是被中断，都在最后统一保存。
+        # 先写入临时文件再替换，避免保存失败时损坏已有结果
+        tmp_excel = output_excel + ".tmp"
+        wb.save(tmp_excel)
+        os.replace(tmp_excel, output_excel)
     
     elapsed_time = time.time() - start_time
     print("\n处理完成!")
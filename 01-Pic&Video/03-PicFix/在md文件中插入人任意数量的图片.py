@@ -1,8 +1,24 @@
 import os
 import random
 import re
+import shutil
+import tempfile
 from typing import List, Optional, Tuple, Dict
 import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+from tqdm import tqdm
+
+
+# 并发处理Markdown文件的线程数
+MAX_WORKERS = 16
+
+# 清理alt文本中的非字母数字字符
+_ALT_CLEAN = re.compile(r'[^a-zA-Z0-9]')
+
+# 匹配图片数量配置中的 "文件名:数量" 对，允许两侧有空白
+_CFG_RE = re.compile(r'\s*([^,:\s][^,:]*?)\s*:\s*(\d+)\s*(?:,|$)')
 
 
 def load_image_urls_from_file(image_txt_path: str) -> List[str]:
@@ -40,7 +56,8 @@ def load_image_urls_from_file(image_txt_path: str) -> List[str]:
     return image_urls
 
 
-def convert_url_to_markdown_image(url: str) -> str:
+@lru_cache(maxsize=None)
+def convert_url_to_markdown_image(url: str) -> bytes:
     """
     将URL转换为Markdown图片格式
     
@@ -48,63 +65,126 @@ def convert_url_to_markdown_image(url: str) -> str:
         url: 图片URL
         
     Returns:
-        Markdown格式的图片引用
+        Markdown格式的图片引用 (UTF-8编码的bytes)
     """
     # 从URL中提取文件名作为alt文本
     try:
         file_name = os.path.basename(url).split('.')[0]
         # 处理特殊字符
-        alt_text = re.sub(r'[^a-zA-Z0-9]', '', file_name) or "image"
-    except:
+        alt_text = _ALT_CLEAN.sub('', file_name) or "image"
+    except (AttributeError, IndexError):
         alt_text = "image"
     
-    return f"![{alt_text}]({url})"
+    return f"![{alt_text}]({url})".encode('utf-8')
 
 
-def insert_images_randomly(text_content: str, image_urls: List[str]) -> str:
+def insert_images_randomly(text_content: bytes, image_urls: List[str]) -> bytes:
     """
     将图片随机插入到文档段落中 (确保插入所有提供的图片URL)
     
+    直接在UTF-8字节上按 b'\n\n' 分段，无需解码/编码整个文件
+    (UTF-8多字节字符中不会出现换行字节)
+    
     Args:
-        text_content: 原始文档内容
+        text_content: 原始文档内容 (UTF-8编码的bytes)
         image_urls: 图片URL列表
         
     Returns:
-        处理后的文档内容
+        处理后的文档内容 (bytes)
     """
     if not image_urls:
         return text_content
     
+    # 与文本模式读取一致，先把 \r\n 和 \r 统一为 \n，否则CRLF文件无法按 b'\n\n' 分段
+    if b'\r' in text_content:
+        text_content = text_content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    
     markdown_images = [convert_url_to_markdown_image(url) for url in image_urls]
     num_images_to_insert = len(markdown_images)
             
     # 将文本按段落分割 (原始段落)
-    paragraphs_original = [p.strip() for p in text_content.split('\n\n') if p.strip()]
+    paragraphs_original = [p.strip() for p in text_content.split(b'\n\n') if p.strip()]
     
     if not paragraphs_original:
         # 如果没有段落 (例如，文件是空的或只有单行无\n\n)
         # 就将所有图片追加到原始内容的末尾
         prefix = text_content.strip()
         if prefix: # 如果原始内容不为空，则在其后添加换行
-            prefix += '\n\n'
-        return prefix + '\n\n'.join(markdown_images)
+            prefix += b'\n\n'
+        return prefix + b'\n\n'.join(markdown_images)
         
     new_content_blocks = []
-    # 为每张要插入的图片选择一个目标段落索引 (在其后插入)
+    # 为每张要插入的图片随机选择一个目标段落 (在其后插入)，只记录每个段落分到的图片数
     # 允许重复选择段落，如果图片数量多于段落数量
-    target_para_indices_for_each_image = sorted(random.choices(range(len(paragraphs_original)), k=num_images_to_insert))
+    num_paragraphs = len(paragraphs_original)
+    images_after_para = [0] * num_paragraphs
+    for _ in range(num_images_to_insert):
+        images_after_para[random.randrange(num_paragraphs)] += 1
     
     current_image_idx = 0
-    for para_idx, para_content in enumerate(paragraphs_original):
+    for para_content, count in zip(paragraphs_original, images_after_para):
         new_content_blocks.append(para_content)
-        # 检查有多少图片被指定要插入到当前这个段落之后
-        while current_image_idx < num_images_to_insert and \
-              target_para_indices_for_each_image[current_image_idx] == para_idx:
-            new_content_blocks.append(markdown_images[current_image_idx])
-            current_image_idx += 1
+        new_content_blocks.extend(markdown_images[current_image_idx:current_image_idx + count])
+        current_image_idx += count
             
     # 重新组合文本
-    return '\n\n'.join(new_content_blocks)
+    return b'\n\n'.join(new_content_blocks)
+
+
+def process_one(md_file: str, all_image_urls: List[str], images_per_file: Dict[str, int], min_count: int, max_count: int) -> int:
+    """
+    处理单个Markdown文件，随机插入图片
+    
+    Args:
+        md_file: Markdown文件路径
+        all_image_urls: 可选的图片URL列表
+        images_per_file: 每个文件插入的图片数量字典 {文件名: 图片数量}
+        min_count: 默认最少插入图片数量
+        max_count: 默认最多插入图片数量
+        
+    Returns:
+        实际插入的图片数量
+    """
+    file_name = os.path.basename(md_file)
+    try:
+        # 以字节方式读取文件内容
+        with open(md_file, 'rb') as f:
+            content = f.read()
+        
+        # 确定插入图片数量
+        num_images: int
+        if file_name in images_per_file:
+            num_images = images_per_file[file_name] # 完全采用用户指定的数量
+        else:
+            num_images = random.randint(min_count, max_count) # 使用默认随机范围
+        
+        if num_images <= 0: # 如果指定数量为0或负数，则跳过
+            tqdm.write(f"[INFO] 跳过: {file_name} - 配置为插入 {num_images} 张图片。")
+            return 0
+        
+        # (all_image_urls 在此必定不为空, 因为调用方已检查)
+        # 随机选择URL，允许重复使用以满足 num_images 的要求
+        selected_urls = random.choices(all_image_urls, k=num_images)
+        
+        # 插入图片
+        new_content = insert_images_randomly(content, selected_urls)
+        
+        # 先写入同目录临时文件，再原子替换原文件，避免写入中途出错导致原文件被截断
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(md_file), suffix='.md.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(new_content)
+            shutil.copymode(md_file, tmp_path)  # mkstemp创建的文件权限为0600，保留原文件权限
+            os.replace(tmp_path, md_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        return len(selected_urls) # 使用实际选择的URL数量
+            
+    except Exception as e:
+        tqdm.write(f"[ERROR] 处理文件 {file_name} 时出错: {str(e)}")
+        return 0
 
 
 def process_markdown_folder(md_folder_path: str, image_txt_path: str, images_per_file: Dict[str, int] = None, default_image_count: Tuple[int, int] = (1, 3)) -> None:
@@ -152,44 +232,13 @@ def process_markdown_folder(md_folder_path: str, image_txt_path: str, images_per
             
         print(f"[INFO] 开始处理 {len(md_files)} 个Markdown文件")
         
-        # 处理每个文件
-        total_images_inserted = 0
+        # 多线程并发处理每个文件
+        worker = partial(process_one, all_image_urls=all_image_urls, images_per_file=images_per_file,
+                         min_count=min_count, max_count=max_count)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = list(tqdm(executor.map(worker, md_files), total=len(md_files), desc="插入图片", unit="个"))
         
-        for idx, md_file in enumerate(md_files):
-            try:
-                file_name = os.path.basename(md_file)
-                
-                # 读取文件内容
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 确定插入图片数量
-                num_images: int
-                if file_name in images_per_file:
-                    num_images = images_per_file[file_name] # 完全采用用户指定的数量
-                else:
-                    num_images = random.randint(min_count, max_count) # 使用默认随机范围
-                
-                if num_images <= 0: # 如果指定数量为0或负数，则跳过
-                    print(f"[INFO] ({idx+1}/{len(md_files)}) 跳过: {file_name} - 配置为插入 {num_images} 张图片。")
-                    continue
-                
-                # (all_image_urls 在此必定不为空, 因为前面有检查)
-                # 随机选择URL，允许重复使用以满足 num_images 的要求
-                selected_urls = random.choices(all_image_urls, k=num_images)
-                
-                # 插入图片
-                new_content = insert_images_randomly(content, selected_urls)
-                
-                # 写回文件
-                with open(md_file, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                
-                total_images_inserted += len(selected_urls) # 使用实际选择的URL数量
-                print(f"[INFO] ({idx+1}/{len(md_files)}) 已处理: {file_name} - 插入了 {len(selected_urls)} 张图片")
-                    
-            except Exception as e:
-                print(f"[ERROR] 处理文件 {os.path.basename(md_file)} 时出错: {str(e)}")
+        total_images_inserted = sum(results)
         
         print(f"[SUCCESS] 处理完成! 共处理 {len(md_files)} 个文件，总共插入 {total_images_inserted} 张图片")
         
@@ -208,21 +257,15 @@ def parse_image_count_config(config_str: str) -> Dict[str, int]:
     Returns:
         配置字典 {文件名: 图片数量}
     """
-    if not config_str or config_str.strip() == "":
+    if not config_str:
         return {}
-        
+    
+    # 一次扫描解析所有配置对，格式错误的配置对只会被跳过，不影响其他配置
     result = {}
-    try:
-        pairs = config_str.split(',')
-        for pair in pairs:
-            if ':' in pair:
-                file_name, count = pair.split(':', 1)
-                file_name = file_name.strip()
-                count = int(count.strip())
-                if count > 0:
-                    result[file_name] = count
-    except Exception as e:
-        print(f"[WARN] 解析图片数量配置失败: {str(e)}")
+    for m in _CFG_RE.finditer(config_str):
+        count = int(m.group(2))
+        if count > 0:
+            result[m.group(1)] = count
     
     return result
 
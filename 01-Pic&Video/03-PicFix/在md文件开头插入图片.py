@@ -1,8 +1,51 @@
 import os
 import random
 import re
-from typing import List, Optional
+import shutil
+from typing import Iterable, List, Optional
 import glob
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from tqdm import tqdm
+
+
+# 并发处理Markdown文件的线程数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 图片选择方式：随机选择（允许重复）或打乱后轮流使用
+PICK_RANDOM = 'random'
+PICK_ROUND_ROBIN = 'round_robin'
+
+# 清理alt文本中的非字母数字字符
+_ALT_CLEAN = re.compile(r'[^a-zA-Z0-9]')
+
+# 匹配第一个一级标题（确保它是以单个#开头，不是##或更多）
+_H1_RE = re.compile(r'^# [^\n]+', re.MULTILINE)
+
+
+def write_file_atomic(file_path, text: str) -> None:
+    """
+    将文本一次性编码后写入同目录临时文件，再原子替换原文件
+    
+    使用底层 os.open/os.write，跳过文本IO层的编码器和缓冲区
+    """
+    data = text.encode('utf-8')
+    tmp_path = file_path + '.tmp'
+    # Windows 上需加 O_BINARY，否则 os.write 会把 \n 转换为 \r\n
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    shutil.copymode(file_path, tmp_path)  # 保留原文件权限
+    os.replace(tmp_path, file_path)
 
 
 def load_image_urls_from_file(image_txt_path: str) -> List[str]:
@@ -40,6 +83,7 @@ def load_image_urls_from_file(image_txt_path: str) -> List[str]:
     return image_urls
 
 
+@lru_cache(maxsize=None)
 def convert_url_to_markdown_image(url: str) -> str:
     """
     将URL转换为Markdown图片格式
@@ -54,8 +98,8 @@ def convert_url_to_markdown_image(url: str) -> str:
     try:
         file_name = os.path.basename(url).split('.')[0]
         # 处理特殊字符
-        alt_text = re.sub(r'[^a-zA-Z0-9]', '', file_name) or "image"
-    except:
+        alt_text = _ALT_CLEAN.sub('', file_name) or "image"
+    except (AttributeError, IndexError):
         alt_text = "image"
     
     return f"![{alt_text}]({url})"
@@ -82,9 +126,8 @@ def insert_image_after_h1(text_content: str, image_url: str) -> str:
     if not text_content.strip():
         return markdown_image
     
-    # 查找第一个一级标题（确保它是以单个#开头，不是##或更多）
-    h1_pattern = re.compile(r'^# [^\n]+', re.MULTILINE)
-    h1_match = h1_pattern.search(text_content)
+    # 查找第一个一级标题
+    h1_match = _H1_RE.search(text_content)
     
     if h1_match:
         # 找到一级标题，在其后插入图片
@@ -95,13 +138,67 @@ def insert_image_after_h1(text_content: str, image_url: str) -> str:
         return markdown_image + "\n\n" + text_content
 
 
-def process_markdown_folder(md_folder_path: str, image_txt_path: str) -> None:
+def process_one(md_file: str, selected_url: str) -> int:
+    """
+    处理单个Markdown文件，插入一张图片
+    
+    Args:
+        md_file: Markdown文件路径
+        selected_url: 为该文件选中的图片URL
+        
+    Returns:
+        实际插入的图片数量
+    """
+    file_name = os.path.basename(md_file)
+    try:
+        # 读取文件内容
+        with open(md_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # 插入图片
+        new_content = insert_image_after_h1(content, selected_url)
+        
+        # 写回文件
+        write_file_atomic(md_file, new_content)
+        return 1
+            
+    except Exception as e:
+        tqdm.write(f"[ERROR] 处理文件 {file_name} 时出错: {str(e)}")
+        return 0
+
+
+def pick_image_urls(all_image_urls: List[str], count: int, mode: str = PICK_RANDOM) -> Iterable[str]:
+    """
+    为每个文件选择一个图片URL
+    
+    Args:
+        all_image_urls: 可选的图片URL列表
+        count: 需要选择的数量
+        mode: PICK_RANDOM 随机选择（允许重复），PICK_ROUND_ROBIN 打乱后轮流使用，尽量避免重复
+        
+    Returns:
+        长度为 count 的图片URL序列
+    """
+    # 只有一个URL时无需随机
+    if len(all_image_urls) == 1:
+        return itertools.repeat(all_image_urls[0], count)
+    
+    if mode == PICK_ROUND_ROBIN:
+        shuffled = random.sample(all_image_urls, len(all_image_urls))
+        return itertools.islice(itertools.cycle(shuffled), count)
+    
+    # 一次性为所有文件随机选择URL
+    return random.choices(all_image_urls, k=count)
+
+
+def process_markdown_folder(md_folder_path: str, image_txt_path: str, pick_mode: str = PICK_RANDOM) -> None:
     """
     处理Markdown文件夹，将一张图片插入到每个MD文件中
     
     Args:
         md_folder_path: Markdown文件夹路径
         image_txt_path: 包含图片URL的文件路径
+        pick_mode: 图片选择方式，PICK_RANDOM 或 PICK_ROUND_ROBIN
     """
     try:
         # 规范化路径
@@ -132,32 +229,13 @@ def process_markdown_folder(md_folder_path: str, image_txt_path: str) -> None:
             
         print(f"[INFO] 开始处理 {len(md_files)} 个Markdown文件")
         
-        # 处理每个文件
-        total_images_inserted = 0
-        
-        for idx, md_file in enumerate(md_files):
-            try:
-                file_name = os.path.basename(md_file)
-                
-                # 读取文件内容
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 随机选择一个URL
-                selected_url = random.choice(all_image_urls)
-                
-                # 插入图片
-                new_content = insert_image_after_h1(content, selected_url)
-                
-                # 写回文件
-                with open(md_file, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                
-                total_images_inserted += 1
-                print(f"[INFO] ({idx+1}/{len(md_files)}) 已处理: {file_name} - 已插入1张图片")
-                    
-            except Exception as e:
-                print(f"[ERROR] 处理文件 {os.path.basename(md_file)} 时出错: {str(e)}")
+        # 一次性为所有文件选择URL
+        picks = pick_image_urls(all_image_urls, len(md_files), pick_mode)
+        
+        # 多线程并发处理每个文件，用进度条代替逐个文件输出
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(process_one, md_files, picks)
+            total_images_inserted = sum(tqdm(results, total=len(md_files), desc="插入图片", unit="个"))
         
         print(f"[SUCCESS] 处理完成! 共处理 {len(md_files)} 个文件，总共插入 {total_images_inserted} 张图片")
         
@@ -167,13 +245,15 @@ def process_markdown_folder(md_folder_path: str, image_txt_path: str) -> None:
 
 
 def main(md_folder_path: Optional[str] = None, 
-         image_txt_path: Optional[str] = None):
+         image_txt_path: Optional[str] = None,
+         pick_mode: Optional[str] = None):
     """
     主函数，处理Markdown文件夹中的所有文件
     
     Args:
         md_folder_path: Markdown文件夹路径，如果为None则从用户获取
         image_txt_path: 包含图片URL的文件路径，如果为None则从用户获取
+        pick_mode: 图片选择方式，如果为None则从用户获取
     """
     try:
         # 如果参数为None，从用户获取输入
@@ -183,8 +263,12 @@ def main(md_folder_path: Optional[str] = None,
         if image_txt_path is None:
             image_txt_path = input("请输入图片URL文件路径: ").strip()
         
+        if pick_mode is None:
+            choice = input("请选择图片选择方式 (1=随机选择[默认], 2=轮流使用，尽量不重复): ").strip()
+            pick_mode = PICK_ROUND_ROBIN if choice == '2' else PICK_RANDOM
+        
         # 处理文件夹
-        process_markdown_folder(md_folder_path, image_txt_path)
+        process_markdown_folder(md_folder_path, image_txt_path, pick_mode)
         
     except KeyboardInterrupt:
         print("\n[INFO] 用户中断了操作")
@@ -9,8 +9,16 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Set
+from typing import Iterator, List, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+# 并发删除文件的线程数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# 日志缓冲的行数，攒够后一次性写出，避免逐行 print
+LOG_FLUSH_LINES = 1000
 
 class ImageCleaner:
     """图片清理器"""
@@ -21,42 +29,104 @@ class ImageCleaner:
         '.webp', '.ico', '.svg', '.raw', '.heic', '.heif'
     }
     
-    def __init__(self, target_suffix: str = "suffix"):
+    def __init__(self, target_suffix: str = "suffix", verbose: bool = False):
         """
         初始化图片清理器
         
         Args:
             target_suffix: 要保留的图片文件名中必须包含的字符串
+            verbose: 是否逐个输出保留/删除的文件，默认只显示进度条和删除失败的文件
         """
         self.target_suffix = target_suffix
-        self.deleted_files = []
-        self.kept_files = []
+        self.verbose = verbose
+        self.deleted_count = 0
+        self.kept_count = 0
         self.total_files_scanned = 0
+        self._log_buffer: List[str] = []
+    
+    def log(self, message: str) -> None:
+        """
+        缓冲一行日志，攒够 LOG_FLUSH_LINES 行后一次性输出
+        
+        Args:
+            message: 日志内容
+        """
+        self._log_buffer.append(message)
+        if len(self._log_buffer) >= LOG_FLUSH_LINES:
+            self.flush_log()
+    
+    def flush_log(self) -> None:
+        """输出缓冲中的全部日志"""
+        if self._log_buffer:
+            tqdm.write('\n'.join(self._log_buffer))
+            self._log_buffer.clear()
     
-    def is_image_file(self, file_path: Path) -> bool:
+    def is_image_file(self, ext: str) -> bool:
         """
         检查文件是否为图片文件
         
         Args:
-            file_path: 文件路径
+            ext: 文件扩展名（含"."）
             
         Returns:
             bool: 是否为图片文件
         """
-        return file_path.suffix.lower() in self.IMAGE_EXTENSIONS
+        return ext.lower() in self.IMAGE_EXTENSIONS
     
-    def should_keep_file(self, file_path: Path) -> bool:
+    def should_keep_file(self, stem: str) -> bool:
         """
         检查文件是否应该保留（文件名包含指定后缀）
         
         Args:
-            file_path: 文件路径
+            stem: 不包含扩展名的文件名
             
         Returns:
             bool: 是否应该保留
         """
-        filename = file_path.stem  # 不包含扩展名的文件名
-        return self.target_suffix in filename
+        return self.target_suffix in stem
+    
+    def iter_image_files(self, root: str) -> Iterator[Tuple[str, str]]:
+        """
+        递归遍历文件夹，只返回图片文件
+        
+        使用 os.scandir 的 DirEntry 缓存的类型信息判断文件/文件夹，无需额外的 stat 调用；
+        无法读取的文件夹直接跳过
+        
+        Args:
+            root: 要遍历的文件夹路径
+            
+        Returns:
+            (文件路径, 不含扩展名的文件名) 的迭代器
+        """
+        try:
+            it = os.scandir(root)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self.iter_image_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stem, ext = os.path.splitext(entry.name)
+                    if self.is_image_file(ext):
+                        yield entry.path, stem
+    
+    @staticmethod
+    def delete_file(file_path: str) -> Optional[Exception]:
+        """
+        删除单个文件
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            删除失败时返回异常，成功时返回None
+        """
+        try:
+            os.unlink(file_path)
+            return None
+        except Exception as e:
+            return e
     
     def scan_and_delete(self, folder_path: str) -> None:
         """
@@ -80,24 +150,30 @@ class ImageCleaner:
         print(f"🗑️  模式: 直接删除")
         print("-" * 60)
         
-        # 递归遍历所有文件
-        for file_path in folder.rglob('*'):
-            if file_path.is_file() and self.is_image_file(file_path):
-                self.total_files_scanned += 1
-                
-                if self.should_keep_file(file_path):
-                    self.kept_files.append(file_path)
-                    print(f"✅ 保留: {file_path}")
-                else:
-                    self.deleted_files.append(file_path)
-                    print(f"❌ 正在删除: {file_path}")
-                    
-                    # 直接删除文件
-                    try:
-                        file_path.unlink()
-                        print(f"   ✅ 删除成功")
-                    except Exception as e:
-                        print(f"   ⚠️  删除失败: {e}")
+        # 递归遍历所有文件，先筛选出需要删除的图片
+        to_delete = []
+        for file_path, stem in tqdm(self.iter_image_files(folder_path), desc="扫描图片", unit="个"):
+            self.total_files_scanned += 1
+            
+            if self.should_keep_file(stem):
+                self.kept_count += 1
+                if self.verbose:
+                    self.log(f"✅ 保留: {file_path}")
+            else:
+                to_delete.append(file_path)
+        self.deleted_count = len(to_delete)
+        self.flush_log()
+        
+        # 多线程并发删除文件，结果按顺序在主线程中汇总输出
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(self.delete_file, to_delete)
+            for file_path, error in tqdm(zip(to_delete, results), total=len(to_delete), desc="删除图片", unit="个"):
+                if error is not None:
+                    self.log(f"⚠️  删除失败: {file_path} ({error})")
+                elif self.verbose:
+                    self.log(f"❌ 已删除: {file_path}")
+        
+        self.flush_log()
     
     def print_summary(self) -> None:
         """
@@ -107,10 +183,10 @@ class ImageCleaner:
         print("📊 扫描结果摘要")
         print("=" * 60)
         print(f"总计扫描图片文件: {self.total_files_scanned}")
-        print(f"保留文件数量: {len(self.kept_files)}")
-        print(f"已删除文件数量: {len(self.deleted_files)}")
+        print(f"保留文件数量: {self.kept_count}")
+        print(f"已删除文件数量: {self.deleted_count}")
         
-        if self.deleted_files:
+        if self.deleted_count:
             print("\n✅ 删除操作已完成")
 
 def main():
@@ -118,9 +194,13 @@ def main():
     print("🖼️  图片文件清理工具")
     print("=" * 40)
     
+    # 命令行参数中的 -v 表示逐个输出保留/删除的文件
+    verbose = '-v' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '-v']
+    
     # 获取用户输入
-    if len(sys.argv) > 1:
-        folder_path = sys.argv[1]
+    if len(args) > 0:
+        folder_path = args[0]
     else:
         folder_path = input("请输入要处理的文件夹路径: ").strip()
     
@@ -129,8 +209,8 @@ def main():
         return
     
     # 获取要保留的文件名后缀
-    if len(sys.argv) > 2:
-        suffix = sys.argv[2]
+    if len(args) > 1:
+        suffix = args[1]
     else:
         suffix = input("请输入要保留的文件名关键字 (默认: suffix): ").strip()
         if not suffix:
@@ -143,7 +223,7 @@ def main():
         return
     
     # 创建清理器并执行
-    cleaner = ImageCleaner(target_suffix=suffix)
+    cleaner = ImageCleaner(target_suffix=suffix, verbose=verbose)
     cleaner.scan_and_delete(folder_path)
     cleaner.print_summary()
 
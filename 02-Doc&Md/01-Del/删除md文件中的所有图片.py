@@ -5,50 +5,76 @@
 
 import os
 import re
-import glob
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+# 并发处理Markdown文件的线程数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 匹配Markdown中的图片标记（不跨行）
+_IMG_RE = re.compile(r'!\[[^\]\n]*\]\([^)\n]*\)')
+# 只包含图片标记（及空白）的整行，连同行尾换行符一起匹配
+_IMG_LINE_RE = re.compile(r'^[ \t]*(?:!\[[^\]\n]*\]\([^)\n]*\)[ \t]*)+(?:\n|\Z)', re.MULTILINE)
+
+def write_file_atomic(file_path, text):
+    """
+    将文本一次性编码后写入同目录临时文件，再原子替换原文件
+    
+    使用底层 os.open/os.write，跳过文本IO层的编码器和缓冲区
+    """
+    data = text.encode('utf-8')
+    tmp_path = file_path + '.tmp'
+    # Windows 上需加 O_BINARY，否则 os.write 会把 \n 转换为 \r\n
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    shutil.copymode(file_path, tmp_path)  # 保留原文件权限
+    os.replace(tmp_path, file_path)
 
 def process_markdown_file(file_path):
     """处理单个Markdown文件，删除所有图片标记及产生的空白行"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # 匹配Markdown中的图片标记
-        image_pattern = re.compile(r'!\[.*?\]\(.*?\)')
+            content = f.read()
         
-        # 处理每一行，删除图片标记
-        new_lines = []
-        modified = False
+        # 不含图片的文件直接跳过
+        if '![' not in content:
+            return False
         
-        for line in lines:
-            # 检查这一行是否只包含图片标记(可能有空格)
-            stripped_line = line.strip()
-            if stripped_line and image_pattern.search(stripped_line):
-                # 如果图片标记删除后这一行变为空，则跳过这一行
-                cleaned_line = image_pattern.sub('', stripped_line)
-                if cleaned_line.strip():
-                    # 如果删除图片后还有其他内容，保留这一行
-                    new_lines.append(image_pattern.sub('', line))
-                else:
-                    # 如果删除图片后这一行变为空，不添加到新内容中
-                    modified = True
-            else:
-                # 不包含图片的行直接保留
-                new_lines.append(line)
-        
-        # 检查是否有变化
-        modified = modified or len(new_lines) != len(lines)
+        # 整个文件只做两次替换：先删除只有图片的行，再删除行内剩余的图片
+        new_content, line_count = _IMG_LINE_RE.subn('', content)
+        new_content, inline_count = _IMG_RE.subn('', new_content)
+        modified = bool(line_count or inline_count)
         
         # 写回文件
         if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+            write_file_atomic(file_path, new_content)
         
         return modified
     except Exception as e:
-        print(f"处理文件 {file_path} 时出错: {e}")
+        tqdm.write(f"处理文件 {file_path} 时出错: {e}")
         return False
 
+def _walk_md(root):
+    """递归遍历文件夹，逐个返回Markdown文件路径（与 glob 一致，跳过隐藏文件和文件夹）"""
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_md(entry.path)
+            elif entry.name.endswith('.md'):
+                yield entry.path
+
 def process_markdown_folder(folder_path):
     """处理文件夹中的所有Markdown文件"""
     # 确保路径末尾有斜杠
@@ -56,7 +82,7 @@ def process_markdown_folder(folder_path):
         folder_path += os.sep
     
     # 获取所有md文件
-    md_files = glob.glob(f"{folder_path}**/*.md", recursive=True)
+    md_files = list(_walk_md(folder_path))
     
     if not md_files:
         print(f"在 {folder_path} 中没有找到Markdown文件")
@@ -67,11 +93,13 @@ def process_markdown_folder(folder_path):
     
     print(f"开始处理 {len(md_files)} 个Markdown文件...")
     
-    for file_path in md_files:
-        processed_count += 1
-        if process_markdown_file(file_path):
-            modified_count += 1
-            print(f"已修改: {file_path}")
+    # 多线程并发处理，用进度条代替逐个文件输出，只统计数量
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(process_markdown_file, md_files)
+        for modified in tqdm(results, total=len(md_files), desc="清理图片", unit="个"):
+            processed_count += 1
+            if modified:
+                modified_count += 1
     
     print(f"\n处理完成!")
     print(f"共处理 {processed_count} 个文件")
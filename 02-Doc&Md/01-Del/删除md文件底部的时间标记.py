@@ -2,41 +2,92 @@ import os
 import re
 from pathlib import Path
 
-def remove_time_mark(file_path):
-    """删除指定 Markdown 文件最后一行的时间标记"""
-    try:
-        # 读取文件内容
-        with open(file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-        
-        if not lines:
-            print(f"文件 {file_path} 为空，跳过处理")
-            return False
-        
-        # 检查最后一行是否是时间标记（格式如 "19:15"）
-        last_line = lines[-1].strip()
-        time_pattern = re.compile(r'^\d{1,2}:\d{2}$')
+from tqdm import tqdm
+
+# 匹配时间标记（格式如 "19:15"）
+_TIME_MARK_RE = re.compile(r'^\d{1,2}:\d{2}$')
+
+# 首次从文件末尾读取的字节数，足以覆盖时间标记及其前面的空行
+TAIL_READ_SIZE = 4096
+
+def _last_line_start(data, end):
+    """返回 data[:end] 中最后一行的起始位置（行尾换行符属于该行）"""
+    return data.rfind(b'\n', 0, end - 1) + 1
+
+def _find_time_mark(tail, complete):
+    """
+    在文件末尾数据中查找时间标记
+    
+    Args:
+        tail: 从文件末尾读取的字节
+        complete: tail 是否已覆盖整个文件
         
-        if time_pattern.match(last_line):
-            # 删除最后一行
-            lines = lines[:-1]
+    Returns:
+        None 表示读取的数据不足以判断；否则返回 (时间标记, 保留的字节数)，
+        没有时间标记时时间标记为空字符串
+    """
+    start = _last_line_start(tail, len(tail))
+    if start == 0 and not complete:
+        return None
+    
+    # 检查最后一行是否是时间标记
+    last_line = tail[start:].decode('utf-8', errors='replace').strip()
+    if not _TIME_MARK_RE.match(last_line):
+        return '', len(tail)
+    
+    # 删除最后一行后，如果新的最后一行是空行，也删除它
+    end = start
+    while end > 0:
+        start = _last_line_start(tail, end)
+        if start == 0 and not complete:
+            return None
+        if tail[start:end].decode('utf-8', errors='replace').strip():
+            break
+        end = start
+    
+    return last_line, end
+
+def remove_time_mark(file_path, verbose=True):
+    """
+    删除指定 Markdown 文件最后一行的时间标记
+    
+    verbose 为 False 时只输出错误信息，批量处理时由进度条汇总结果
+    """
+    try:
+        # 只读取文件末尾，命中时直接截断文件，无需读写整个文件
+        with open(file_path, 'r+b') as file:
+            file_size = file.seek(0, os.SEEK_END)
             
-            # 如果新的最后一行是空行，也删除它
-            while lines and lines[-1].strip() == '':
-                lines = lines[:-1]
+            if file_size == 0:
+                if verbose:
+                    print(f"文件 {file_path} 为空，跳过处理")
+                return False
             
-            # 写回文件
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.writelines(lines)
+            read_size = TAIL_READ_SIZE
+            while True:
+                read_size = min(read_size, file_size)
+                file.seek(-read_size, os.SEEK_END)
+                tail = file.read(read_size)
+                found = _find_time_mark(tail, read_size == file_size)
+                if found is not None:
+                    break
+                # 末尾数据不足以判断（例如最后一行过长），扩大读取范围
+                read_size *= 2
             
+            last_line, keep = found
+            if not last_line:
+                if verbose:
+                    print(f"文件 {file_path} 最后一行不是时间标记，跳过处理")
+                return False
+            
+            file.truncate(file_size - len(tail) + keep)
+        
+        if verbose:
             print(f"已从 {file_path} 删除时间标记 '{last_line}'")
-            return True
-        else:
-            print(f"文件 {file_path} 最后一行不是时间标记，跳过处理")
-            return False
+        return True
     
     except Exception as e:
-        print(f"处理文件 {file_path} 时出错: {str(e)}")
+        tqdm.write(f"处理文件 {file_path} 时出错: {str(e)}")
         return False
 
 def main():
@@ -62,14 +113,11 @@ def main():
         if remove_time_mark(path):
             processed_count += 1
     elif path.is_dir():
-        if recursive:
-            for md_file in path.glob('**/*.md'):
-                if remove_time_mark(md_file):
-                    processed_count += 1
-        else:
-            for md_file in path.glob('*.md'):
-                if remove_time_mark(md_file):
-                    processed_count += 1
+        md_files = list(path.glob('**/*.md' if recursive else '*.md'))
+        # 用进度条代替逐个文件输出，只统计处理数量
+        for md_file in tqdm(md_files, desc="删除时间标记", unit="个"):
+            if remove_time_mark(md_file, verbose=False):
+                processed_count += 1
     else:
         print(f"错误：{path} 不是有效的 Markdown 文件或目录")
     
@@ -1,6 +1,71 @@
+import mmap
 import os
 import re
+import shutil
 import sys
+import tempfile
+
+from tqdm import tqdm
+
+# This pattern matches lines that start with a single # followed by a space/tab,
+# ensuring it's not a higher level heading (##, ###)
+_H1_LINE_RE = re.compile(r'^#[ \t](?!#).*(\n|\r\n?)?', re.MULTILINE)
+# Every first-level heading line starts with one of these prefixes
+_H1_PREFIXES = ('# ', '#\t')
+
+def has_h1_candidate(file_path):
+    """
+    Cheaply check whether a markdown file may contain a first-level heading.
+    
+    Searches the raw bytes for a heading prefix at the start of a line, so files
+    without any candidate skip the regex and the rewrite entirely.
+    """
+    with open(file_path, 'rb') as file:
+        if file.read(2) in (b'# ', b'#\t'):
+            return True
+        if os.fstat(file.fileno()).st_size <= 2:
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # A lone CR also ends a line (CR-only files), so check both line endings
+            return any(mm.find(prefix) != -1 for prefix in (b'\n# ', b'\n#\t', b'\r# ', b'\r#\t'))
+
+def strip_h1_lines(file_path):
+    """
+    Stream a markdown file line by line, dropping first-level heading lines.
+    
+    Output goes to a temporary file in the same folder, which atomically replaces
+    the original only when something was removed.
+    
+    Args:
+        file_path: Path to the markdown file
+        
+    Returns:
+        True if the file was modified
+    """
+    modified = False
+    # newline='' splits lines on LF, CRLF and lone CR alike (so a CR-only file is
+    # not one giant line) while leaving each line's ending untranslated
+    with open(file_path, 'r', encoding='utf-8', newline='') as src, \
+         tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', delete=False,
+                                     dir=os.path.dirname(file_path), suffix='.md.tmp') as tmp:
+        try:
+            for line in src:
+                if line.startswith(_H1_PREFIXES) and _H1_LINE_RE.match(line):
+                    modified = True
+                else:
+                    tmp.write(line)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    
+    if not modified:
+        os.unlink(tmp.name)
+        return False
+    
+    shutil.copymode(file_path, tmp.name)
+    os.replace(tmp.name, file_path)
+    return True
 
 def remove_h1_headings(folder_path):
     """
@@ -25,34 +90,19 @@ def remove_h1_headings(folder_path):
     processed_files = 0
     modified_files = 0
     
-    # Process each markdown file
-    for md_file in md_files:
+    # Process each markdown file, reporting progress with a bar instead of a line per file
+    for md_file in tqdm(md_files, desc="删除H1标题", unit="个"):
         file_path = os.path.join(folder_path, md_file)
         
         try:
-            # Read the file content
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Remove first-level headings using regex
-            # This pattern matches lines that start with a single # followed by a space/tab,
-            # ensuring it's not a higher level heading (##, ###)
-            new_content = re.sub(r'^#[ \t](?!#).*(\n|\r\n?)?', '', content, flags=re.MULTILINE)
-            
-            # Check if any changes were made
-            if new_content != content:
-                # Write the modified content back to the file
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(new_content)
+            # Remove first-level headings, streaming the file to cap memory use
+            if has_h1_candidate(file_path) and strip_h1_lines(file_path):
                 modified_files += 1
-                print(f"已修改: {md_file}")
-            else:
-                print(f"无需修改: {md_file}")
             
             processed_files += 1
             
         except Exception as e:
-            print(f"处理 {md_file} 时出错: {str(e)}")
+            tqdm.write(f"处理 {md_file} 时出错: {str(e)}")
     
     print(f"完成! 处理了 {processed_files} 个文件, 修改了 {modified_files} 个文件。")
 
@@ -13,29 +13,25 @@ def remove_underscores_from_filenames(folder_path):
             print(f"错误: '{folder_path}' 不是一个有效的文件夹路径")
             return
         
-        # 获取文件夹中的所有项目
-        items = os.listdir(folder_path)
-        
         # 计数器
         renamed_count = 0
         
-        # 遍历所有项目
-        for item in items:
-            # 构建完整路径
-            old_path = os.path.join(folder_path, item)
-            
+        # 先收集需要重命名的文件，避免边遍历边修改目录
+        with os.scandir(folder_path) as it:
+            # 先做子串判断，只对包含下划线的项目检查类型（DirEntry 已缓存类型信息）
             # 只处理文件，不处理文件夹
-            if os.path.isfile(old_path):
-                # 如果文件名包含下划线
-                if "_" in item:
-                    # 创建新文件名（删除下划线）
-                    new_name = item.replace("_", "")
-                    new_path = os.path.join(folder_path, new_name)
-                    
-                    # 重命名文件
-                    os.rename(old_path, new_path)
-                    print(f"已重命名: '{item}' -> '{new_name}'")
-                    renamed_count += 1
+            entries = [entry for entry in it
+                       if "_" in entry.name and entry.is_file()]
+        
+        for entry in entries:
+            # 创建新文件名（删除下划线）
+            new_name = entry.name.replace("_", "")
+            new_path = os.path.join(folder_path, new_name)
+            
+            # 重命名文件
+            os.rename(entry.path, new_path)
+            print(f"已重命名: '{entry.name}' -> '{new_name}'")
+            renamed_count += 1
         
         if renamed_count > 0:
             print(f"\n完成! 共重命名了 {renamed_count} 个文件。")
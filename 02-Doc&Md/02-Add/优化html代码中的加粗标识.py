@@ -1,16 +1,51 @@
 import os
 import re
+import shutil
 import glob
 
-def convert_markdown_bold_to_html(content):
-    """将**文本**格式转换为<strong>文本</strong>格式"""
-    # 使用正则表达式查找所有的**文本**格式
-    pattern = r'\*\*([^*]+)\*\*'
+from tqdm import tqdm
+
+# 匹配**文本**格式
+_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+
+def write_file_atomic(file_path, text):
+    """
+    将文本一次性编码后写入同目录临时文件，再原子替换原文件
+    
+    使用底层 os.open/os.write，跳过文本IO层的编码器和缓冲区
+    """
+    data = text.encode('utf-8')
+    tmp_path = file_path + '.tmp'
+    # Windows 上需加 O_BINARY，否则 os.write 会把 \n 转换为 \r\n
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    shutil.copymode(file_path, tmp_path)  # 保留原文件权限
+    os.replace(tmp_path, file_path)
+
+def _convert_bold(content):
+    """将**文本**格式转换为<strong>文本</strong>格式，返回 (转换后内容, 替换次数)"""
+    parts = content.split('**')
+    bold_parts = parts[1::2]
     
-    # 替换为<strong>文本</strong>
-    converted_content = re.sub(pattern, r'<strong>\1</strong>', content)
+    # "**"成对出现且加粗文本非空、不含"*"时，按分隔符交替拼接即可，无需正则
+    if len(parts) % 2 == 1 and all(part and '*' not in part for part in bold_parts):
+        parts[1::2] = [f'<strong>{part}</strong>' for part in bold_parts]
+        return ''.join(parts), len(bold_parts)
     
-    return converted_content
+    # 其他情况退回正则匹配，保证结果与原逻辑一致
+    return _BOLD_RE.subn(r'<strong>\1</strong>', content)
+
+def convert_markdown_bold_to_html(content):
+    """将**文本**格式转换为<strong>文本</strong>格式"""
+    return _convert_bold(content)[0]
 
 def process_txt_files(folder_path):
     """处理指定文件夹中的所有TXT文件"""
@@ -24,38 +59,32 @@ def process_txt_files(folder_path):
     total_files = len(txt_files)
     processed_files = 0
     modified_files = 0
+    total_replacements = 0
     
     print(f"找到 {total_files} 个TXT文件")
     
-    for file_path in txt_files:
+    # 用进度条代替逐个文件输出，只汇总统计结果
+    for file_path in tqdm(txt_files, desc="转换加粗标识", unit="个"):
         try:
             # 读取TXT文件内容
             with open(file_path, 'r', encoding='utf-8') as file:
                 content = file.read()
             
-            # 转换格式
-            converted_content = convert_markdown_bold_to_html(content)
-            
-            # 统计替换次数
-            original_count = content.count('**')
-            converted_count = converted_content.count('**')
-            replacements = (original_count - converted_count) // 2
+            # 转换格式并统计替换次数
+            converted_content, replacements = _convert_bold(content)
             
             # 如果内容有变化，则写回文件
-            if content != converted_content:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(converted_content)
-                print(f"✓ 已处理: {os.path.basename(file_path)} (替换了 {replacements} 处)")
+            if replacements:
+                write_file_atomic(file_path, converted_content)
                 modified_files += 1
-            else:
-                print(f"- 无需修改: {os.path.basename(file_path)}")
+                total_replacements += replacements
                 
             processed_files += 1
                 
         except Exception as e:
-            print(f"✗ 处理 {file_path} 时出错: {str(e)}")
+            tqdm.write(f"✗ 处理 {file_path} 时出错: {str(e)}")
     
-    print(f"\n处理完成! 共处理 {processed_files} 个文件，修改了 {modified_files} 个文件。")
+    print(f"\n处理完成! 共处理 {processed_files} 个文件，修改了 {modified_files} 个文件，共替换 {total_replacements} 处。")
 
 def process_single_file(file_path):
     """处理单个TXT文件"""
@@ -66,18 +95,12 @@ def process_single_file(file_path):
         with open(file_path, 'r', encoding='utf-8') as file:
             content = file.read()
         
-        # 转换格式
-        converted_content = convert_markdown_bold_to_html(content)
-        
-        # 统计替换次数
-        original_count = content.count('**')
-        converted_count = converted_content.count('**')
-        replacements = (original_count - converted_count) // 2
+        # 转换格式并统计替换次数
+        converted_content, replacements = _convert_bold(content)
         
         # 如果内容有变化，则写回文件
-        if content != converted_content:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(converted_content)
+        if replacements:
+            write_file_atomic(file_path, converted_content)
             print(f"✓ 已处理: {os.path.basename(file_path)} (替换了 {replacements} 处)")
             return True
         else:
@@ -3,6 +3,81 @@
 
 import os
 import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+# 已存在的二级标题（## 01、## 02等）
+_SECTION_TITLE_RE = re.compile(r'##\s+0[1-4][^\n]*\n')
+# 正文开头独占一行的图片（允许前面有空行）
+_LEADING_IMG_RE = re.compile(r'\n*(!\[[^\]\n]*\]\([^)\n]*\)\s*\n)')
+# 开头的空行
+_LEADING_BLANK_RE = re.compile(r'\s*\n')
+# 段落分隔符（空行）
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+
+def write_file_atomic(file_path, text):
+    """
+    将文本一次性编码后写入同目录临时文件，再原子替换原文件
+    
+    使用底层 os.open/os.write，跳过文本IO层的编码器和缓冲区
+    """
+    data = text.encode('utf-8')
+    tmp_path = file_path + '.tmp'
+    # Windows 上需加 O_BINARY，否则 os.write 会把 \n 转换为 \r\n
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    shutil.copymode(file_path, tmp_path)  # 保留原文件权限
+    os.replace(tmp_path, file_path)
+
+def _parse_header(content):
+    """
+    从头向后扫描一遍，拆分出标题部分（YAML头信息、一级标题、开头的图片）和正文
+    
+    返回 (标题部分, 正文)
+    """
+    pos = 0
+    
+    # 跳过YAML头信息 (--- 到 ---)，直接查找结束标记
+    if content.startswith('---\n'):
+        yaml_end = content.find('\n---\n', 4)
+        if yaml_end != -1:
+            pos = yaml_end + 5
+    
+    # 跳过一级标题 (# 开头的行)
+    if content.startswith('# ', pos):
+        line_end = content.find('\n', pos)
+        if line_end != -1:
+            pos = line_end + 1
+    
+    title_end = pos
+    
+    # 查找正文开头连续的图片，游标依次匹配
+    header_images = []
+    while True:
+        image_match = _LEADING_IMG_RE.match(content, pos)
+        if not image_match:
+            break
+        header_images.append(image_match.group(1))
+        pos = image_match.end()
+    
+    if not header_images:
+        return content[:title_end], content[title_end:]
+    
+    # 如果图片后面有空行，也一并去除，并将图片添加到标题部分
+    blank_match = _LEADING_BLANK_RE.match(content, pos)
+    if blank_match:
+        pos = blank_match.end()
+    return content[:title_end] + ''.join(header_images) + "\n\n", content[pos:]
 
 def process_markdown_file(file_path):
     """
@@ -10,64 +85,30 @@ def process_markdown_file(file_path):
     """
     # 读取文件内容
     with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+        original_content = f.read()
     
     # 去除可能已存在的二级标题（## 01、## 02等）
-    content = re.sub(r'##\s+0[1-4].*?\n', '', content)
-    
-    # 提取文章正文，跳过可能存在的YAML头信息和一级标题
-    # 跳过YAML头信息 (--- 到 ---)
-    yaml_match = re.match(r'---\n.*?\n---\n', content, re.DOTALL)
-    if yaml_match:
-        # 如果有YAML头，从头结束后开始处理
-        start_pos = yaml_match.end()
-        title_part = content[:start_pos]
-        main_content = content[start_pos:]
-    else:
-        title_part = ""
-        main_content = content
+    content = _SECTION_TITLE_RE.sub('', original_content)
     
-    # 跳过一级标题 (# 开头的行)
-    first_title_match = re.match(r'# .*?\n', main_content)
-    if first_title_match:
-        title_part += main_content[:first_title_match.end()]
-        main_content = main_content[first_title_match.end():]
-    
-    # 查找开头的图片
-    image_pattern = r'!\[.*?\]\(.*?\)'
-    header_images = ""
-    
-    # 查找文章开头所有的图片
-    image_matches = re.findall(r'^' + image_pattern + r'\s*\n', main_content, re.MULTILINE)
-    if image_matches:
-        for match in image_matches:
-            # 将图片从主内容中移除并添加到标题部分
-            main_content = main_content.replace(match, '', 1)
-            header_images += match
-        
-        # 如果图片后面有空行，也添加到标题部分
-        main_content = re.sub(r'^\s*\n', '', main_content, 1)
-        
-        # 将图片添加到标题部分
-        title_part += header_images + "\n\n"
+    # 拆分出标题部分和正文
+    title_part, main_content = _parse_header(content)
     
     # 按段落分割内容（空行作为分隔符）
-    paragraphs = re.split(r'\n\s*\n', main_content.strip())
+    paragraphs = _PARAGRAPH_SPLIT_RE.split(main_content.strip())
     
     # 计算每个小节应该包含的段落数量
     total_paragraphs = len(paragraphs)
     paragraphs_per_section = total_paragraphs // 4
     remainder = total_paragraphs % 4
     
-    # 初始化结果
-    result = title_part if title_part else ""
+    # 初始化结果，先收集各部分，最后一次性拼接
+    parts = [title_part] if title_part else []
     
     # 分配段落到各个小节
     current_paragraph = 0
     for section in range(1, 5):
         # 添加二级标题
-        section_title = f"## {section:02d}\n\n"
-        result += section_title
+        parts.append(f"## {section:02d}\n\n")
         
         # 计算当前小节应包含的段落数
         section_paragraphs = paragraphs_per_section
@@ -75,17 +116,28 @@ def process_markdown_file(file_path):
             section_paragraphs += 1
         
         # 添加该小节的段落
-        for i in range(section_paragraphs):
-            if current_paragraph < total_paragraphs:
-                result += paragraphs[current_paragraph] + "\n\n"
-                current_paragraph += 1
+        for paragraph in paragraphs[current_paragraph:current_paragraph + section_paragraphs]:
+            parts.append(paragraph)
+            parts.append("\n\n")
+        current_paragraph += section_paragraphs
     
-    # 保存修改后的内容到原始文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(result.strip() + "\n")
+    # 内容有变化时才保存到原始文件
+    new_content = ''.join(parts).strip() + "\n"
+    if new_content != original_content:
+        write_file_atomic(file_path, new_content)
     
     return True
 
+def _process_one(file_path):
+    """
+    在子进程中处理单个文件，返回 (文件名, 是否成功, 错误信息)
+    """
+    filename = os.path.basename(file_path)
+    try:
+        return filename, process_markdown_file(file_path), None
+    except Exception as e:
+        return filename, False, str(e)
+
 def process_folder(folder_path):
     """
     处理指定文件夹中的所有Markdown文件
@@ -99,17 +151,20 @@ def process_folder(folder_path):
         return
     
     # 处理文件夹中的所有markdown文件
-    for filename in os.listdir(folder_path):
-        if filename.endswith('.md'):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                if process_markdown_file(file_path):
-                    success_count += 1
-                    print(f"成功处理: {filename}")
-                else:
-                    failed_files.append(filename)
-            except Exception as e:
-                print(f"处理 {filename} 时出错: {str(e)}")
+    md_files = [os.path.join(folder_path, filename)
+                for filename in os.listdir(folder_path) if filename.endswith('.md')]
+    
+    # 分段需要多次正则扫描，属于CPU密集型，使用多进程并发处理
+    # 用进度条代替逐个文件输出，失败的文件在最后统一列出
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_process_one, md_files, chunksize=16)
+        for filename, ok, error in tqdm(results, total=len(md_files), desc="添加H2标题", unit="个"):
+            if error is not None:
+                tqdm.write(f"处理 {filename} 时出错: {error}")
+                failed_files.append(filename)
+            elif ok:
+                success_count += 1
+            else:
                 failed_files.append(filename)
     
     # 输出处理结果统计
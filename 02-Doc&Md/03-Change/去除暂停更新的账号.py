@@ -3,10 +3,41 @@ import datetime
 import os
 from datetime import timedelta
 
+# 分析只需要这两列
+USECOLS = ['发文日期', '公众号']
+# 超过该大小的 .xlsx 文件改用 openpyxl 只读模式流式读取
+STREAMING_READ_THRESHOLD = 100 * 1024 * 1024
+
+def read_account_sheet(file_path):
+    """
+    读取Excel文件中分析所需的列
+    
+    pandas 会根据文件内容自动选择引擎（.xlsb 使用 pyxlsb）；
+    特别大的 .xlsx 文件则直接流式读取单元格值，跳过 pandas 的转换流程
+    """
+    is_xlsx = file_path.lower().endswith(('.xlsx', '.xlsm'))
+    if not (is_xlsx and os.path.getsize(file_path) > STREAMING_READ_THRESHOLD):
+        return pd.read_excel(file_path, usecols=USECOLS, dtype={'公众号': 'string'})
+    
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        missing = [col for col in USECOLS if col not in header]
+        if missing:
+            raise ValueError(f"缺少必要的列: {missing}")
+        col_idx = [header.index(col) for col in USECOLS]
+        data = [[row[i] if i < len(row) else None for i in col_idx] for row in rows]
+    finally:
+        wb.close()
+    
+    return pd.DataFrame(data, columns=USECOLS).astype({'公众号': 'string'})
+
 def analyze_active_accounts(file_path, days=7):
     try:
-        # 读取Excel文件
-        df = pd.read_excel(file_path)
+        # 读取Excel文件（只读取需要的列）
+        df = read_account_sheet(file_path)
         
         # 输出初始信息
         print(f"已读取文件，共 {len(df)} 行数据")
@@ -16,13 +47,16 @@ def analyze_active_accounts(file_path, days=7):
         print(f"过滤'作者精选'后，剩余 {len(df)} 行数据")
         
         # 确保日期是数字格式（可能是Excel序列号）
-        numeric_date_rows = pd.to_numeric(df['发文日期'], errors='coerce').notna()
+        date_serials = pd.to_numeric(df['发文日期'], errors='coerce')
+        numeric_date_rows = date_serials.notna()
         df = df[numeric_date_rows]
+        date_serials = date_serials[numeric_date_rows]
         print(f"过滤非数字日期后，剩余 {len(df)} 行数据")
         
         # 将序列号转换为实际日期 - 使用Excel的基准日期 (1899-12-30)
+        # 整列向量化计算，避免逐行调用Python函数
         excel_epoch = pd.Timestamp('1899-12-30')
-        df['日期转换'] = df['发文日期'].apply(lambda x: excel_epoch + timedelta(days=int(x)))
+        df = df.assign(日期转换=excel_epoch + pd.to_timedelta(date_serials.astype('int64'), unit='D'))
         
         # 获取最新的发文日期
         latest_date = df['日期转换'].max()
@@ -33,7 +67,7 @@ def analyze_active_accounts(file_path, days=7):
         
         # 获取在窗口期内有发文的公众号
         active_df = df[df['日期转换'] >= date_window_start]
-        active_accounts_df = active_df[['公众号']].drop_duplicates()
+        active_accounts_df = pd.Series(active_df['公众号'].unique(), name='公众号').to_frame()
         
         # 生成输出文件名 - 基于文件所在的文件夹名
         # 获取文件所在的文件夹路径
@@ -5,7 +5,12 @@
 
 import os
 import shutil
-import pandas as pd
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from openpyxl import load_workbook
+
+# 并发执行移动操作的线程数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 def read_excel_filenames(excel_file):
     """
@@ -18,28 +23,74 @@ def read_excel_filenames(excel_file):
         包含文件名的集合
     """
     try:
-        # 读取Excel文件
-        df = pd.read_excel(excel_file, engine='openpyxl')
-        
-        # 查找包含文件名的列
-        filename_column = None
-        for column in df.columns:
-            if '文件名' in column.lower():
-                filename_column = column
-                break
-        
-        if filename_column is None:
-            # 如果没有找到名为"文件名"的列，使用第一列
-            filename_column = df.columns[0]
+        # 以只读模式逐行读取，只取文件名所在的一列，不构建DataFrame
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            header = next(ws.iter_rows(max_row=1, values_only=True), ())
             
-        # 提取文件名并转换为集合
-        filenames = set(df[filename_column].dropna().astype(str).tolist())
+            # 查找包含文件名的列（也支持英文表头 filename），找不到时使用第一列
+            column_names = ['' if column is None else str(column).lower() for column in header]
+            filename_column = next(
+                (idx for idx, name in enumerate(column_names) if '文件名' in name or 'filename' in name),
+                0,
+            )
+            
+            # 只取文件名这一列，直接生成去重的集合，不经过中间列表；
+            # 文件名驻留（intern）后，集合中重复出现的名字共用同一个字符串对象
+            column_rows = ws.iter_rows(min_row=2, min_col=filename_column + 1,
+                                       max_col=filename_column + 1, values_only=True)
+            filenames = {sys.intern(str(value)) for (value,) in column_rows if value is not None}
+        finally:
+            wb.close()
         return filenames
     
     except Exception as e:
         print(f"读取Excel文件时出错: {e}")
         return set()
 
+def _move_no_clobber(source_path, dest_path, same_device):
+    """
+    移动单个文件，目标已存在时抛出 FileExistsError，绝不覆盖
+    
+    同一文件系统优先用 os.link + os.unlink（目标存在时 link 原子地失败），
+    不支持硬链接时再检查目标后交给 shutil.move
+    """
+    if same_device:
+        try:
+            os.link(source_path, dest_path)
+        except FileExistsError:
+            raise
+        except OSError:
+            pass
+        else:
+            os.unlink(source_path)
+            return
+    if os.path.exists(dest_path):
+        raise FileExistsError(dest_path)
+    shutil.move(source_path, dest_path)
+
+def move_file(source_path, dest_path, same_device):
+    """
+    移动单个文件；扫描之后目标文件夹中才出现的同名文件不会被覆盖，
+    而是与扫描时一样依次改名为 文件名_1、文件名_2……
+    
+    返回:
+        移动失败时返回异常，成功时返回None
+    """
+    try:
+        base, extension = os.path.splitext(dest_path)
+        i = 0
+        while True:
+            try:
+                _move_no_clobber(source_path, dest_path, same_device)
+                return None
+            except FileExistsError:
+                i += 1
+                dest_path = f"{base}_{i}{extension}"
+    except Exception as e:
+        return e
+
 def compare_and_move_files(folder_path, excel_filenames, destination_folder):
     """
     比对文件夹中的文件与Excel中的文件名，移动不在Excel中的文件
@@ -51,7 +102,7 @@ def compare_and_move_files(folder_path, excel_filenames, destination_folder):
         destination_folder: 移动文件的目标文件夹
     
     返回:
-        移动的文件数量
+        (移动的文件数量, 保留在源文件夹的文件数量)
     """
     # 确保目标文件夹存在
     if not os.path.exists(destination_folder):
@@ -59,40 +110,70 @@ def compare_and_move_files(folder_path, excel_filenames, destination_folder):
         print(f"创建目标文件夹: {destination_folder}")
     
     moved_count = 0
+    kept_count = 0
     
     try:
-        # 获取文件夹中的所有文件
-        all_files = [f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
+        # 目标文件夹中已占用的文件名，重名检查只查内存中的集合，不再逐个 stat
+        # （统一转为 casefold，在不区分大小写的文件系统上 a.txt 与 A.txt 也视为重名）
+        with os.scandir(destination_folder) as it:
+            taken = {entry.name.casefold() for entry in it}
+        # 每个 (文件名, 后缀) 已用到的重名编号，下次从这里继续往后找
+        counters = {}
+        # 源文件夹和目标文件夹在同一文件系统时，直接重命名即可完成移动
+        same_device = os.stat(folder_path).st_dev == os.stat(destination_folder).st_dev
         
-        # 对比并移动文件
-        for filename in all_files:
-            # 提取不含后缀的文件名进行对比
-            filename_without_ext = os.path.splitext(filename)[0]
+        # 获取文件夹中的所有文件（DirEntry 已缓存类型信息，无需逐个 stat）
+        with os.scandir(folder_path) as it:
+            all_files = [entry for entry in it if entry.is_file(follow_symlinks=False)]
+        
+        # 对比文件并确定目标文件名（重名检查依赖已占用集合，需按顺序进行）
+        moves = []
+        for entry in all_files:
+            filename = entry.name
+            # 提取不含后缀的文件名进行对比，单次 rpartition 同时得到文件名和后缀
+            # （与 os.path.splitext 一致，开头的点不视为后缀分隔符）
+            base, dot, extension = filename.rpartition('.')
+            if dot and base.lstrip('.'):
+                filename_without_ext, extension = base, dot + extension
+            else:
+                filename_without_ext, extension = filename, ''
             
             if filename_without_ext not in excel_filenames:
                 # 文件名不在Excel列表中，需要移动
-                source_path = os.path.join(folder_path, filename)
-                dest_path = os.path.join(destination_folder, filename)
+                source_path = entry.path
+                dest_name = filename
                 
                 # 检查目标文件夹中是否已存在同名文件
-                if os.path.exists(dest_path):
-                    base, extension = os.path.splitext(filename)
-                    i = 1
-                    while os.path.exists(dest_path):
-                        new_filename = f"{base}_{i}{extension}"
-                        dest_path = os.path.join(destination_folder, new_filename)
+                if dest_name.casefold() in taken:
+                    key = (filename_without_ext.casefold(), extension.casefold())
+                    i = counters.get(key, 0) + 1
+                    while f"{filename_without_ext}_{i}{extension}".casefold() in taken:
                         i += 1
-                
-                # 移动文件
-                shutil.move(source_path, dest_path)
+                    counters[key] = i
+                    dest_name = f"{filename_without_ext}_{i}{extension}"
+                taken.add(dest_name.casefold())
+                dest_path = os.path.join(destination_folder, dest_name)
+                moves.append((filename, source_path, dest_path))
+            else:
+                kept_count += 1
+        
+        # 多线程并发提交移动操作，让各次重命名的元数据写入延迟相互重叠；
+        # 结果按顺序在主线程中汇总输出
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(lambda move: move_file(move[1], move[2], same_device), moves)
+            for (filename, _, _), error in zip(moves, results):
+                if error is not None:
+                    print(f"移动 {filename} 时出错: {error}")
+                    kept_count += 1
+                    continue
                 print(f"已移动: {filename} -> {destination_folder}")
                 moved_count += 1
                 
-        return moved_count
+        return moved_count, kept_count
     
     except Exception as e:
         print(f"比对和移动文件时出错: {e}")
-        return moved_count
+        return moved_count, kept_count
 
 def main():
     # 获取用户输入
@@ -125,15 +206,12 @@ def main():
         print(f"Excel中的部分文件名示例: {', '.join(sample_names)}")
     
     # 比对并移动文件
-    moved_count = compare_and_move_files(source_folder, excel_filenames, destination_folder)
+    moved_count, remaining_files = compare_and_move_files(source_folder, excel_filenames, destination_folder)
     
     # 打印结果
     print(f"\n处理完成:")
     print(f"- Excel中的文件名数量: {len(excel_filenames)}")
     print(f"- 移动的文件数量: {moved_count}")
-    
-    # 计算留在源文件夹的文件数量
-    remaining_files = len([f for f in os.listdir(source_folder) if os.path.isfile(os.path.join(source_folder, f))])
     print(f"- 保留在源文件夹的文件数量: {remaining_files}")
     
     if moved_count == 0 and remaining_files > 0:
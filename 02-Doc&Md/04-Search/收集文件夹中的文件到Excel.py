@@ -1,24 +1,108 @@
 import os
+from itertools import islice
+
 import pandas as pd
-from pathlib import Path
+
+try:
+    import xlsxwriter  # noqa: F401  optional; faster, lower-memory Excel output
+    HAS_XLSXWRITER = True
+except ImportError:
+    HAS_XLSXWRITER = False
+
+# Number of filenames per Parquet row group when streaming to disk
+PARQUET_CHUNK_SIZE = 100_000
+
+def _iter_files(root):
+    """
+    Iterate over the names of all files under root, using an explicit stack
+    instead of os.walk so each entry's cached type info from os.scandir is reused.
+    Directories that cannot be read are skipped, as os.walk does.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.name
 
 def collect_filenames(directory):
     """
     Recursively collect filenames from a directory and its subdirectories,
     excluding extensions.
     
-    Returns a list of filenames without extensions.
+    Returns a generator of filenames without extensions.
     """
-    filenames = []
+    # Get filename without extension
+    return (os.path.splitext(name)[0] for name in _iter_files(directory))
+
+def write_parquet_chunked(filenames, output_file):
+    """
+    Stream filenames to a Parquet file one row group at a time, so memory use
+    stays bounded by PARQUET_CHUNK_SIZE no matter how many files there are.
     
-    # Walk through directory and subdirectories
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            # Get filename without extension
-            filename_without_ext = Path(file).stem
-            filenames.append(filename_without_ext)
+    Returns the number of filenames written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
     
-    return filenames
+    schema = pa.schema([("文件名", pa.string())])
+    count = 0
+    filenames = iter(filenames)
+    with pq.ParquetWriter(output_file, schema, compression="snappy") as writer:
+        while True:
+            chunk = list(islice(filenames, PARQUET_CHUNK_SIZE))
+            if not chunk:
+                break
+            writer.write_table(pa.table({"文件名": pa.array(chunk, type=pa.string())}, schema=schema))
+            count += len(chunk)
+    return count
+
+def save_filenames(filenames, output_file):
+    """
+    Save filenames to output_file, picking the format from its extension.
+    
+    .parquet, .feather and .csv are written directly and are much faster than
+    Excel for large lists; any other extension is saved as an Excel workbook.
+    Parquet output is streamed in chunks; other formats collect the names first.
+    
+    Returns the number of filenames saved.
+    """
+    suffix = os.path.splitext(output_file)[1].lower()
+    if suffix == ".parquet":
+        return write_parquet_chunked(filenames, output_file)
+    
+    filenames = list(filenames)
+    if suffix == ".feather":
+        # Build a contiguous Arrow string column and write it directly,
+        # skipping the object-dtype DataFrame entirely
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        table = pa.table({"文件名": pa.array(filenames, type=pa.string())})
+        feather.write_feather(table, output_file, compression="lz4")
+        return len(filenames)
+    
+    df = pd.DataFrame(filenames, columns=["文件名"])
+    
+    if suffix == ".csv":
+        df.to_csv(output_file, index=False)
+    elif HAS_XLSXWRITER:
+        # xlsxwriter's constant_memory mode streams rows instead of buffering the workbook;
+        # filenames are always written as plain strings, never as formulas or links
+        options = {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False}
+        with pd.ExcelWriter(output_file, engine="xlsxwriter",
+                            engine_kwargs={"options": options}) as writer:
+            df.to_excel(writer, index=False)
+    else:
+        # Fall back to pandas' default Excel engine when xlsxwriter is not installed
+        df.to_excel(output_file, index=False)
+    return len(filenames)
 
 def main():
     # Ask for directory path
@@ -30,21 +114,15 @@ def main():
         return
     
     # Ask for output file path
-    output_file = input("请输入输出的Excel文件路径 (默认: filenames.xlsx): ")
+    output_file = input("请输入输出的文件路径 (默认: filenames.xlsx，也可使用 .parquet/.feather/.csv): ")
     if not output_file:
         output_file = "filenames.xlsx"
     
     try:
-        # Collect filenames
-        filenames = collect_filenames(directory)
-        
-        # Create DataFrame
-        df = pd.DataFrame(filenames, columns=["文件名"])
-        
-        # Save to Excel
-        df.to_excel(output_file, index=False)
+        # Collect filenames lazily and save to the format matching the output extension
+        count = save_filenames(collect_filenames(directory), output_file)
         
-        print(f"成功保存 {len(filenames)} 个文件名到 {output_file}")
+        print(f"成功保存 {count} 个文件名到 {output_file}")
     
     except PermissionError:
         print("错误: 访问某些文件夹或文件时权限被拒绝。")
@@ -5,6 +5,15 @@
 import os
 import pandas as pd
 
+try:
+    import xlsxwriter  # noqa: F401  可选依赖，安装后Excel输出更快、更省内存
+    HAS_XLSXWRITER = True
+except ImportError:
+    HAS_XLSXWRITER = False
+
+# 支持的输出格式
+OUTPUT_SUFFIXES = ('.xlsx', '.parquet', '.feather', '.csv')
+
 def get_files_in_directory(folder_path):
     """
     获取指定文件夹中的所有文件名（不含子文件夹，不含文件后缀）
@@ -38,34 +47,61 @@ def get_files_in_directory(folder_path):
         print(f"获取文件时出错: {e}")
         return []
 
-def save_to_excel(file_list, output_excel):
+def save_filenames(file_list, output_path):
     """
-    将文件名列表保存到Excel文件
+    将文件名列表保存到文件，根据后缀选择输出格式
+    
+    .parquet / .feather / .csv 直接按对应格式写出，写入速度远快于Excel；
+    其他后缀按Excel保存
     
     参数:
         file_list: 文件名列表
-        output_excel: 输出的Excel文件路径
+        output_path: 输出文件路径
     """
     try:
+        suffix = os.path.splitext(output_path)[1].lower()
+        if suffix in ('.parquet', '.feather'):
+            # 直接构建连续存储的Arrow字符串列并写出，不经过 object 类型的DataFrame
+            import pyarrow as pa
+            table = pa.table({'文件名': pa.array(file_list, type=pa.string())})
+            if suffix == '.parquet':
+                import pyarrow.parquet as pq
+                pq.write_table(table, output_path, compression='snappy')
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, output_path, compression='lz4')
+            print(f"文件名已成功保存到 {output_path}")
+            return
+        
         # 创建DataFrame
         df = pd.DataFrame(file_list, columns=['文件名'])
         
-        # 保存到Excel，不包含索引
-        df.to_excel(output_excel, sheet_name='文件列表', index=False)
+        if suffix == '.csv':
+            df.to_csv(output_path, index=False)
+        elif HAS_XLSXWRITER:
+            # xlsxwriter 的 constant_memory 模式逐行写出，不在内存中缓存整个工作簿；
+            # 文件名一律按普通文本写入，不把 "=" 开头的当作公式、也不识别为链接
+            options = {'constant_memory': True, 'strings_to_formulas': False, 'strings_to_urls': False}
+            with pd.ExcelWriter(output_path, engine='xlsxwriter',
+                                engine_kwargs={'options': options}) as writer:
+                df.to_excel(writer, sheet_name='文件列表', index=False)
+        else:
+            # 未安装 xlsxwriter 时使用pandas默认的Excel引擎
+            df.to_excel(output_path, sheet_name='文件列表', index=False)
             
-        print(f"文件名已成功保存到 {output_excel}")
+        print(f"文件名已成功保存到 {output_path}")
     except Exception as e:
-        print(f"保存Excel时出错: {e}")
+        print(f"保存文件时出错: {e}")
 
 def main():
     # 获取用户输入的文件夹路径
     folder_path = input("请输入要扫描的文件夹路径: ").strip()
     
-    # 设置输出Excel文件路径（默认在当前目录下）
-    output_excel = input("请输入保存的Excel文件名 (默认为'文件列表.xlsx'): ").strip()
+    # 设置输出文件路径（默认在当前目录下），支持 .xlsx/.parquet/.feather/.csv
+    output_excel = input("请输入保存的文件名 (默认为'文件列表.xlsx'，也可使用 .parquet/.feather/.csv): ").strip()
     if not output_excel:
         output_excel = "文件列表.xlsx"
-    if not output_excel.endswith('.xlsx'):
+    if not output_excel.lower().endswith(OUTPUT_SUFFIXES):
         output_excel += '.xlsx'
     
     # 获取文件列表
@@ -74,8 +110,8 @@ def main():
     if files:
         print(f"找到 {len(files)} 个文件")
         
-        # 保存到Excel
-        save_to_excel(files, output_excel)
+        # 保存到文件
+        save_filenames(files, output_excel)
     else:
         print("没有找到文件或文件夹为空")
 
@@ -6,11 +6,71 @@ MD文件标点分段工具
 作者：Assistant
 """
 
+import asyncio
+import io
+import mmap
 import os
 import re
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# 引号内的片段（中英文单双引号、直角引号）或引号外的句末标点，
+# 由正则引擎一次扫描完成，不再逐字符循环
+_SEGMENT_RE = re.compile(
+    r'"[^"]*"?'
+    r"|'[^']*'?"
+    r'|\u201c[^\u201d]*\u201d?'
+    r'|\u2018[^\u2019]*\u2019?'
+    r'|\u300c[^\u300d]*\u300d?'
+    r'|([。？！])'
+)
+# 超过两个连续换行
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+# 句末标点
+_SENTENCE_MARKS = ('。', '？', '！')
+_SENTENCE_MARKS_BYTES = tuple(mark.encode('utf-8') for mark in _SENTENCE_MARKS)
+
+# 与上面相同的规则，直接作用于UTF-8字节（多字节的引号和标点写成对应的字节序列）
+_SEGMENT_BYTES_RE = re.compile(
+    rb'"[^"]*"?'
+    rb"|'[^']*'?"
+    rb'|\xe2\x80\x9c(?:[^\xe2]|\xe2(?!\x80\x9d))*(?:\xe2\x80\x9d)?'
+    rb'|\xe2\x80\x98(?:[^\xe2]|\xe2(?!\x80\x99))*(?:\xe2\x80\x99)?'
+    rb'|\xe3\x80\x8c(?:[^\xe3]|\xe3(?!\x80\x8d))*(?:\xe3\x80\x8d)?'
+    rb'|(\xe3\x80\x82|\xef\xbc\x9f|\xef\xbc\x81)'
+)
+_EXTRA_NEWLINES_BYTES_RE = re.compile(rb'\n{3,}')
+
+# 处理目录时同时进行读写的文件数上限
+IO_CONCURRENCY = 32
+
+
+def _segment(content, segment_re, extra_newlines_re, buffer, blank, marks):
+    """
+    按句末标点分段的公共实现，content 可以是 str，也可以是 bytes/mmap
+    
+    引号内的片段整体匹配、原样保留（未闭合的引号一直延续到文末），
+    只在引号外的句末标点处切分，把上一个切分点到这里的整段切片写入缓冲区
+    """
+    # 先用C层面的子串查找确认存在句末标点，没有时无需逐段扫描引号
+    # （用 find 而不是 in：对 mmap 而言 in 只比较单个字节，找不到多字节的标点）
+    if all(content.find(mark) == -1 for mark in marks):
+        return extra_newlines_re.sub(blank, content)
+    
+    write = buffer.write
+    last_emit = 0
+    for match in segment_re.finditer(content):
+        if match.group(1):
+            end = match.end()
+            write(content[last_emit:end])
+            write(blank)
+            last_emit = end
+    write(content[last_emit:])
+    
+    # 去除多余的空行（超过两个连续换行的情况）
+    return extra_newlines_re.sub(blank, buffer.getvalue())
+
 
 def process_content(content):
     """
@@ -22,49 +82,23 @@ def process_content(content):
     Returns:
         str: 处理后的文本内容
     """
-    result = []
-    i = 0
-    in_quotes = False
-    quote_pairs = {
-        '"': '"',
-        '"': '"', 
-        "'": "'",
-        "'": "'",
-        '"': '"',  # 处理英文双引号
-        "'": "'"   # 处理英文单引号
-    }
-    current_quote_start = None
-    
-    while i < len(content):
-        char = content[i]
-        
-        # 检查是否遇到开始引号
-        if not in_quotes and char in quote_pairs:
-            in_quotes = True
-            current_quote_start = char
-            result.append(char)
-        # 检查是否遇到结束引号
-        elif in_quotes and char == quote_pairs.get(current_quote_start, ''):
-            in_quotes = False
-            current_quote_start = None
-            result.append(char)
-        # 处理标点符号
-        elif char in ['。', '？', '！']:
-            result.append(char)
-            # 只有在引号外才添加段落分隔
-            if not in_quotes:
-                result.append('\n\n')
-        else:
-            result.append(char)
-        
-        i += 1
-    
-    processed_content = ''.join(result)
-    
-    # 去除多余的空行（超过两个连续换行的情况）
-    processed_content = re.sub(r'\n{3,}', r'\n\n', processed_content)
+    return _segment(content, _SEGMENT_RE, _EXTRA_NEWLINES_RE, io.StringIO(), '\n\n', _SENTENCE_MARKS)
+
+
+def process_content_bytes(data):
+    """
+    与 process_content 相同，但直接处理UTF-8编码的字节（bytes 或 mmap），无需先解码
     
-    return processed_content
+    Args:
+        data (bytes): 要处理的UTF-8文本字节
+        
+    Returns:
+        bytes: 处理后的文本字节
+    """
+    # 与文本模式读取一致，把 \r\n 和 \r 统一为 \n（没有 \r 时直接处理原数据，不复制）
+    if data.find(b'\r') != -1:
+        data = bytes(data).replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return _segment(data, _SEGMENT_BYTES_RE, _EXTRA_NEWLINES_BYTES_RE, io.BytesIO(), b'\n\n', _SENTENCE_MARKS_BYTES)
 
 
 def process_md_file(file_path, output_path=None):
@@ -76,19 +110,21 @@ def process_md_file(file_path, output_path=None):
         output_path (str): 输出文件路径，如果为None则覆盖原文件
     """
     try:
-        # 读取文件内容
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # 处理内容
-        processed_content = process_content(content)
+        # 将文件映射到内存，直接在字节上处理，不必把整个文件读入并解码
+        # （映射在写回前关闭，覆盖原文件时不会冲突）
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                processed_content = b''
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    processed_content = process_content_bytes(mm)
         
         # 确定输出路径
         if output_path is None:
             output_path = file_path
         
         # 写入处理后的内容
-        with open(output_path, 'w', encoding='utf-8') as file:
+        with open(output_path, 'wb') as file:
             file.write(processed_content)
         
         print(f"✅ 已处理文件: {file_path}")
@@ -99,22 +135,85 @@ def process_md_file(file_path, output_path=None):
         print(f"❌ 处理文件失败 {file_path}: {str(e)}")
 
 
-def process_directory(directory_path, output_directory=None):
+def _read_bytes(path):
+    """读取文件的全部字节"""
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _write_bytes(path, data):
+    """将字节写入文件"""
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+async def _process_files_async(tasks, jobs=None):
     """
-    处理目录中的所有md文件
+    异步流水线处理多个文件：读写放到线程中执行，分段计算交给进程池，
+    使一部分文件的读写与另一部分文件的计算相互重叠
+    
+    Args:
+        tasks (list): (输入文件路径, 输出文件路径) 列表，输出路径为None时覆盖原文件
+        jobs (int): 分段计算的进程数，默认为CPU核心数
+    """
+    loop = asyncio.get_running_loop()
+    # 限制同时在读写中的文件数，避免一次性把所有文件读入内存
+    semaphore = asyncio.Semaphore(IO_CONCURRENCY)
+    
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as cpu_pool:
+        async def process_one(input_path, output_path):
+            async with semaphore:
+                try:
+                    data = await asyncio.to_thread(_read_bytes, input_path)
+                    processed = await loop.run_in_executor(cpu_pool, process_content_bytes, data)
+                    await asyncio.to_thread(_write_bytes, output_path or input_path, processed)
+                except Exception as e:
+                    print(f"❌ 处理文件失败 {input_path}: {str(e)}")
+                    return
+            
+            print(f"✅ 已处理文件: {input_path}")
+            if output_path and output_path != input_path:
+                print(f"   输出到: {output_path}")
+        
+        await asyncio.gather(*(process_one(input_path, output_path) for input_path, output_path in tasks))
+
+
+def _find_md(root):
+    """
+    递归查找目录及其子目录中的md文件，返回字符串路径（跳过隐藏文件和文件夹，以及无法读取的文件夹）
+    
+    Args:
+        root (str): 要查找的目录路径
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _find_md(entry.path)
+            elif entry.name.endswith('.md') and entry.is_file(follow_symlinks=False):
+                yield entry.path
+
+
+def process_directory(directory_path, output_directory=None, jobs=None):
+    """
+    处理目录及其子目录中的所有md文件
     
     Args:
         directory_path (str): 输入目录路径
         output_directory (str): 输出目录路径，如果为None则覆盖原文件
+        jobs (int): 并行处理的进程数，默认为CPU核心数
     """
-    directory = Path(directory_path)
-    
-    if not directory.exists():
+    if not os.path.isdir(directory_path):
         print(f"❌ 目录不存在: {directory_path}")
         return
     
-    # 查找所有md文件
-    md_files = list(directory.glob("*.md"))
+    # 递归查找所有md文件
+    md_files = list(_find_md(directory_path))
     
     if not md_files:
         print(f"❌ 在目录 {directory_path} 中未找到md文件")
@@ -122,16 +221,18 @@ def process_directory(directory_path, output_directory=None):
     
     print(f"🔍 找到 {len(md_files)} 个md文件")
     
-    for md_file in md_files:
-        if output_directory:
-            # 创建输出目录
-            output_dir = Path(output_directory)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / md_file.name
-        else:
-            output_path = None
-        
-        process_md_file(str(md_file), str(output_path) if output_path else None)
+    if output_directory:
+        # 在输出目录中保持与输入目录相同的子目录结构
+        tasks = []
+        for md_file in md_files:
+            output_path = os.path.join(output_directory, os.path.relpath(md_file, directory_path))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            tasks.append((md_file, output_path))
+    else:
+        tasks = [(md_file, None) for md_file in md_files]
+    
+    # 各文件相互独立：计算用多进程并行，读写异步进行，在慢速存储上也能保持CPU忙碌
+    asyncio.run(_process_files_async(tasks, jobs))
 
 
 def main():
@@ -139,6 +240,7 @@ def main():
     parser.add_argument('path', help='要处理的文件或目录路径')
     parser.add_argument('-o', '--output', help='输出路径（文件或目录）')
     parser.add_argument('--preview', action='store_true', help='预览模式，显示处理后的内容但不保存')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='处理目录时的并行进程数（默认为CPU核心数）')
     
     args = parser.parse_args()
     
@@ -173,7 +275,7 @@ def main():
         process_md_file(str(input_path), args.output)
     elif input_path.is_dir():
         # 处理目录
-        process_directory(str(input_path), args.output)
+        process_directory(str(input_path), args.output, args.jobs)
     else:
         print("❌ 无效的路径类型")
 
@@ -193,6 +295,25 @@ def test_quote_processing():
     print("\n" + "="*50)
 
 
+def test_md_file_processing():
+    """测试 process_md_file 在真实文件上的分段结果"""
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'test.md')
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write('这是正常的句子。这里应该分段！')
+        
+        process_md_file(file_path)
+        
+        with open(file_path, 'r', encoding='utf-8') as file:
+            result = file.read()
+    
+    assert result == '这是正常的句子。\n\n这里应该分段！\n\n', repr(result)
+    assert process_content_bytes('第一句。\r\n第二句！'.encode('utf-8')) == '第一句。\n\n第二句！\n\n'.encode('utf-8')
+    print("🧪 文件处理测试通过")
+
+
 if __name__ == "__main__":
     print("🚀 MD文件标点分段工具")
     print("=" * 40)
@@ -204,6 +325,7 @@ if __name__ == "__main__":
         
         # 先运行测试
         test_quote_processing()
+        test_md_file_processing()
         
         print("请输入要处理的文件或目录路径:")
         path = input().strip()
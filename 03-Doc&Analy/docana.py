@@ -1,14 +1,24 @@
 import os
 import re
 import jieba
-import pandas as pd
+import numpy as np
+import xlsxwriter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
 import json
 
+try:
+    import orjson  # 可选，序列化速度远快于标准库json
+except ImportError:
+    orjson = None
+
 # 处理PDF文件
+try:
+    import fitz  # PyMuPDF，可选，纯文本提取速度远快于pdfplumber
+except ImportError:
+    fitz = None
+
 try:
     import PyPDF2
     import pdfplumber
@@ -17,13 +27,111 @@ except ImportError:
     print("警告: 未安装PDF处理库，请运行: pip install PyPDF2 pdfplumber")
     PDF_AVAILABLE = False
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
+# 中文、字母数字、空白和常用中英文标点以外的特殊字符
+_CLEAN_RE = re.compile(r'[^\u4e00-\u9fff\w\s。！？，、；：""''（）【】《》\.\!\?\,\;\:\(\)\[\]\"\']+')
+# 分句用的句末标点
+_SPLIT_RE = re.compile(r'[。！？\.\!\?]+')
+# 整数或小数
+_NUM_RE = re.compile(r'\d+\.?\d*')
+
+def _dumps_json(obj):
+    """将对象序列化为缩进2格、保留中文的UTF-8 JSON字节"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+# 句子质量等级的信息密度阈值
+HIGH_DENSITY_THRESHOLD = 0.15
+MEDIUM_DENSITY_THRESHOLD = 0.08
+# 质量分档的密度分界点，np.searchsorted 后 0/1/2 依次对应 低/中/高
+_QUALITY_BINS = np.array([MEDIUM_DENSITY_THRESHOLD, HIGH_DENSITY_THRESHOLD])
+
+def _score_sentence(n_num, n_time, n_prof, n_conj, n_mod, total_chars, weights):
+    """
+    根据各类信息的数量计算单句的 (信息得分, 信息密度, 质量等级)
+    
+    只做整数/浮点运算，不访问统计字典
+    """
+    info_score = (
+        n_num * weights['number'] +
+        n_time * weights['time'] +
+        n_prof * weights['professional'] +
+        n_conj * weights['conjunction'] +
+        n_mod * weights['modifier']
+    )
+    density = info_score / total_chars if total_chars > 0 else 0
+    
+    if density > HIGH_DENSITY_THRESHOLD:
+        quality = "高"
+    elif density > MEDIUM_DENSITY_THRESHOLD:
+        quality = "中"
+    else:
+        quality = "低"
+    return info_score, density, quality
+
+# Excel报告的表头
+SUMMARY_HEADERS = (
+    '文件名', '总句数', '总字数', '平均信息密度', '高质量句子占比', '高质量句子数',
+    '中质量句子数', '低质量句子数', '数字信息数量', '时间词数量', '平均句长'
+)
+DETAIL_HEADERS = (
+    '文件名', '句子内容', '信息密度', '质量等级', '字数', '数字数量', '时间词数量', '专业术语数量'
+)
+
+# 句子分析结果缓存的最大条数
+SENTENCE_CACHE_SIZE = 100_000
+
+# 并行分析PDF的最大进程数
+MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+# 每个子进程各自持有一个分析器，由进程池的 initializer 设置，处理各个文件时复用
+_ANALYZER = None
+
+def _tokenize_sentences(sentences):
+    """
+    整篇文档一次性分词，再按句子拆回，返回每个句子的分词列表
+    
+    句子之间用换行连接：换行不属于jieba的词块字符，分词不会跨越它，
+    且会单独作为一个词返回，结果与逐句调用 jieba.lcut 相同
+    """
+    if any('\n' in sentence for sentence in sentences):
+        return [jieba.lcut(sentence) for sentence in sentences]
+    
+    words_per_sentence = [[]]
+    for word in jieba.cut('\n'.join(sentences)):
+        if word == '\n':
+            words_per_sentence.append([])
+        else:
+            words_per_sentence[-1].append(word)
+    return words_per_sentence
+
+def _init_worker(analyzer):
+    """子进程初始化：保存主进程传来的分析器（每个进程只反序列化一次）"""
+    global _ANALYZER
+    # 文件之间已经多进程并行，进程内逐页提取即可，不再额外开线程
+    analyzer.page_workers = 1
+    _ANALYZER = analyzer
+    # 提前加载jieba词典，避免每个进程在第一个句子上才延迟初始化
+    jieba.initialize()
+
+def _process_one_pdf(pdf_path):
+    """在子进程中提取、清理并分析单个PDF文件，返回 (分析结果, 错误信息)"""
+    text, error = _ANALYZER.extract_text_from_pdf(pdf_path)
+    if error:
+        return None, error
+    
+    clean_text = _ANALYZER.clean_text(text)
+    return _ANALYZER.analyze_text(clean_text, os.path.basename(pdf_path)), None
 
 class PDFInfoDensityAnalyzer:
-    def __init__(self):
-        """初始化分析器"""
+    def __init__(self, page_workers=4):
+        """
+        初始化分析器
+        
+        page_workers: 单个PDF内并行提取页面文本的线程数
+        """
+        self.page_workers = page_workers
+        
         # 信息价值权重
         self.weights = {
             'number': 3.0,      # 数字信息
@@ -56,6 +164,34 @@ class PDFInfoDensityAnalyzer:
             '数据', '分析', '系统', '平台', '技术', '算法', '模型', '框架',
             '架构', '方案', '策略', '机制', '流程', '标准', '规范', '指标'
         ]
+        
+        # 句子分析结果缓存：PDF中页眉、页脚、免责声明等句子经常重复出现，
+        # 相同的句子只分词和计算一次（修改权重或词汇库后需调用 clear_cache）
+        self._sentence_cache = {}
+        self._build_lookups()
+
+    def _build_lookups(self):
+        """根据词汇库构建查找结构，并清空依赖它们的词语分类缓存"""
+        # 整词匹配用集合，时间词是子串匹配，合并为一个正则
+        self._time_re = re.compile('|'.join(map(re.escape, self.time_keywords)))
+        self._prof_set = frozenset(self.professional_terms)
+        self._conj_set = frozenset(self.conjunction_keywords)
+        self._mod_set = frozenset(self.modifier_keywords)
+        # 词语 -> 各类别标记 (时间词, 专业术语, 连接词, 修饰词, 实体)，
+        # 同一个词在整批文档中反复出现，只需判断一次
+        self._word_categories = {}
+
+    def _classify_word(self, word):
+        """判断一个词属于哪些类别，返回由0/1组成的元组"""
+        return (
+            1 if self._time_re.search(word) else 0,
+            1 if word in self._prof_set else 0,
+            1 if word in self._conj_set else 0,
+            1 if word in self._mod_set else 0,
+            # 简化的实体识别：先比较长度，单字词不再做字符类别判断；
+            # str.isalpha 本身是C实现，比同等的正则整词匹配更快
+            1 if len(word) > 1 and word.isalpha() else 0,
+        )
 
     def extract_text_from_pdf(self, pdf_path):
         """从PDF文件提取文本"""
@@ -65,20 +201,31 @@ class PDFInfoDensityAnalyzer:
         text = ""
         error_msg = None
         
+        # 首先尝试使用PyMuPDF（已安装时），这里只需要纯文本
+        if fitz is not None:
+            try:
+                with fitz.open(pdf_path) as doc:
+                    return "\n".join(page.get_text("text") for page in doc).strip(), None
+            except Exception:
+                pass
+        
         try:
-            # 首先尝试使用pdfplumber
+            # 其次使用pdfplumber，各页相互独立，用线程池并行提取
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                pages = list(pdf.pages)
+                if self.page_workers > 1 and len(pages) > 1:
+                    with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+                        page_texts = list(executor.map(lambda page: page.extract_text(), pages))
+                else:
+                    page_texts = [page.extract_text() for page in pages]
+            text = "\n".join(page_text for page_text in page_texts if page_text)
         except Exception as e:
             try:
                 # 如果pdfplumber失败，尝试PyPDF2
                 with open(pdf_path, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
+                    # 各页文本收集到列表中最后一次性拼接，避免循环中反复拼接字符串
+                    text = "\n".join(page.extract_text() or "" for page in pdf_reader.pages)
             except Exception as e2:
                 error_msg = f"PDF读取失败: {str(e2)}"
         
@@ -89,54 +236,49 @@ class PDFInfoDensityAnalyzer:
         if not text:
             return ""
         
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
+        # 移除多余的空白字符（str.split/join 在C层完成，比正则替换快）
+        text = ' '.join(text.split())
         # 移除特殊字符但保留中文标点
-        text = re.sub(r'[^\u4e00-\u9fff\w\s。！？，、；：""''（）【】《》\.\!\?\,\;\:\(\)\[\]\"\']+', ' ', text)
+        text = _CLEAN_RE.sub(' ', text)
         
         return text.strip()
 
-    def analyze_sentence(self, sentence):
-        """分析单句信息密度"""
+    def analyze_sentence(self, sentence, words=None):
+        """
+        分析单句信息密度
+        
+        words: 已分好的词，不传时在这里分词
+        """
         if not sentence.strip():
             return None
         
         # 分词
-        words = jieba.lcut(sentence)
-        total_chars = len(sentence.replace(' ', ''))  # 不计算空格
+        if words is None:
+            words = jieba.lcut(sentence)
+        total_chars = len(sentence) - sentence.count(' ')  # 不计算空格，无需生成去掉空格的新字符串
         
         if total_chars == 0:
             return None
         
-        # 统计各类信息
-        stats = {
-            'numbers': len(re.findall(r'\d+\.?\d*', sentence)),
-            'time_words': sum(1 for word in words if any(t in word for t in self.time_keywords)),
-            'professional_terms': sum(1 for word in words if word in self.professional_terms),
-            'conjunctions': sum(1 for word in words if word in self.conjunction_keywords),
-            'modifiers': sum(1 for word in words if word in self.modifier_keywords),
-            'entities': len([w for w in words if len(w) > 1 and w.isalpha()]),  # 简化的实体识别
-        }
-        
-        # 计算信息得分
-        info_score = (
-            stats['numbers'] * self.weights['number'] +
-            stats['time_words'] * self.weights['time'] +
-            stats['professional_terms'] * self.weights['professional'] +
-            stats['conjunctions'] * self.weights['conjunction'] +
-            stats['modifiers'] * self.weights['modifier']
-        )
-        
-        # 计算密度
-        density = info_score / total_chars if total_chars > 0 else 0
-        
-        # 质量等级
-        if density > 0.15:
-            quality = "高"
-        elif density > 0.08:
-            quality = "中"
-        else:
-            quality = "低"
+        # 统计各类信息：遍历一次分词结果，每个词只查一次分类缓存，计数放在局部变量中
+        word_categories = self._word_categories
+        classify_word = self._classify_word
+        n_time = n_prof = n_conj = n_mod = n_ent = 0
+        for word in words:
+            flags = word_categories.get(word)
+            if flags is None:
+                flags = word_categories[word] = classify_word(word)
+            n_time += flags[0]
+            n_prof += flags[1]
+            n_conj += flags[2]
+            n_mod += flags[3]
+            n_ent += flags[4]
+        
+        n_num = len(_NUM_RE.findall(sentence))
+        
+        # 计算信息得分、密度和质量等级
+        info_score, density, quality = _score_sentence(
+            n_num, n_time, n_prof, n_conj, n_mod, total_chars, self.weights)
         
         return {
             'sentence': sentence[:100] + "..." if len(sentence) > 100 else sentence,
@@ -144,9 +286,35 @@ class PDFInfoDensityAnalyzer:
             'quality': quality,
             'total_chars': total_chars,
             'info_score': info_score,
-            **stats
+            'numbers': n_num,
+            'time_words': n_time,
+            'professional_terms': n_prof,
+            'conjunctions': n_conj,
+            'modifiers': n_mod,
+            'entities': n_ent,
         }
 
+    def clear_cache(self):
+        """清空句子分析结果缓存，并按当前词汇库重建查找结构"""
+        self._sentence_cache.clear()
+        self._build_lookups()
+
+    def _analyze_sentences_cached(self, sentences):
+        """
+        分析一组句子，返回与 sentences 一一对应的分析结果
+        
+        只对缓存中没有的句子（去重后）分词和计算，缓存超过 SENTENCE_CACHE_SIZE 时清空重建
+        """
+        cache = self._sentence_cache
+        new_sentences = [s for s in dict.fromkeys(sentences) if s not in cache]
+        if len(cache) + len(new_sentences) > SENTENCE_CACHE_SIZE:
+            # 清空后原先命中的句子也要重新计算
+            cache.clear()
+            new_sentences = list(dict.fromkeys(sentences))
+        for sentence, words in zip(new_sentences, _tokenize_sentences(new_sentences)):
+            cache[sentence] = self.analyze_sentence(sentence, words)
+        return [cache[sentence] for sentence in sentences]
+
     def analyze_text(self, text, filename=""):
         """分析整篇文本"""
         if not text:
@@ -160,8 +328,8 @@ class PDFInfoDensityAnalyzer:
             }
         
         # 分句
-        sentences = re.split(r'[。！？\.\!\?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 5]
+        # 每个片段只 strip 一次，过短的片段（不超过5个字符）直接丢弃
+        sentences = [s for s in map(str.strip, _SPLIT_RE.split(text)) if len(s) > 5]
         
         if not sentences:
             return {
@@ -173,14 +341,26 @@ class PDFInfoDensityAnalyzer:
                 'sentences': []
             }
         
-        # 分析每个句子
-        sentence_results = []
-        for sentence in sentences:
-            result = self.analyze_sentence(sentence)
-            if result:
-                sentence_results.append(result)
+        # 分析每个句子，边分析边累加整体指标，只保留前10个句子的详细信息
+        first_sentences = []
+        analyzed_count = 0
+        densities = []
+        total_chars = 0
+        total_numbers = 0
+        total_time_words = 0
+        for result in self._analyze_sentences_cached(sentences):
+            if not result:
+                continue
+            
+            analyzed_count += 1
+            densities.append(result['density'])
+            total_chars += result['total_chars']
+            total_numbers += result['numbers']
+            total_time_words += result['time_words']
+            if len(first_sentences) < 10:
+                first_sentences.append(result)
         
-        if not sentence_results:
+        if not analyzed_count:
             return {
                 'filename': filename,
                 'error': '句子分析失败',
@@ -190,34 +370,24 @@ class PDFInfoDensityAnalyzer:
                 'sentences': []
             }
         
-        # 计算整体指标
-        densities = [r['density'] for r in sentence_results]
-        average_density = sum(densities) / len(densities)
-        high_quality_count = len([r for r in sentence_results if r['quality'] == '高'])
-        high_quality_ratio = high_quality_count / len(sentence_results)
-        
-        # 统计信息
-        total_chars = sum(r['total_chars'] for r in sentence_results)
-        total_numbers = sum(r['numbers'] for r in sentence_results)
-        total_time_words = sum(r['time_words'] for r in sentence_results)
+        # 整个文档的句子一次性按密度分档计数，代替逐句累加质量等级
+        low, medium, high = np.bincount(
+            np.searchsorted(_QUALITY_BINS, densities), minlength=3).tolist()
+        quality_counts = {'高': high, '中': medium, '低': low}
         
         return {
             'filename': filename,
-            'total_sentences': len(sentence_results),
+            'total_sentences': analyzed_count,
             'total_chars': total_chars,
-            'average_density': average_density,
-            'high_quality_ratio': high_quality_ratio,
-            'quality_distribution': {
-                '高': len([r for r in sentence_results if r['quality'] == '高']),
-                '中': len([r for r in sentence_results if r['quality'] == '中']),
-                '低': len([r for r in sentence_results if r['quality'] == '低'])
-            },
+            'average_density': sum(densities) / analyzed_count,
+            'high_quality_ratio': quality_counts['高'] / analyzed_count,
+            'quality_distribution': quality_counts,
             'content_stats': {
                 'numbers_count': total_numbers,
                 'time_words_count': total_time_words,
-                'avg_sentence_length': total_chars / len(sentence_results)
+                'avg_sentence_length': total_chars / analyzed_count
             },
-            'sentences': sentence_results[:10]  # 只保留前10个句子的详细信息
+            'sentences': first_sentences  # 只保留前10个句子的详细信息
         }
 
     def analyze_pdf_folder(self, folder_path, output_dir="analysis_results"):
@@ -241,24 +411,20 @@ class PDFInfoDensityAnalyzer:
         results = []
         failed_files = []
         
-        for i, filename in enumerate(pdf_files, 1):
-            print(f"正在处理 ({i}/{len(pdf_files)}): {filename}")
-            
-            pdf_path = os.path.join(folder_path, filename)
-            
-            # 提取文本
-            text, error = self.extract_text_from_pdf(pdf_path)
-            
-            if error:
-                failed_files.append({'filename': filename, 'error': error})
-                continue
-            
-            # 清理文本
-            clean_text = self.clean_text(text)
-            
-            # 分析文本
-            result = self.analyze_text(clean_text, filename)
-            results.append(result)
+        # 各PDF相互独立，提取文本和分析都是CPU密集型，使用多进程并行处理；
+        # 结果按文件顺序返回
+        pdf_paths = [os.path.join(folder_path, f) for f in pdf_files]
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            outcomes = executor.map(_process_one_pdf, pdf_paths, chunksize=4)
+            for i, (filename, (result, error)) in enumerate(zip(pdf_files, outcomes), 1):
+                print(f"已处理 ({i}/{len(pdf_files)}): {filename}")
+                
+                if error:
+                    failed_files.append({'filename': filename, 'error': error})
+                    continue
+                
+                results.append(result)
         
         # 生成报告
         self.generate_reports(results, failed_files, output_dir)
@@ -271,90 +437,118 @@ class PDFInfoDensityAnalyzer:
         """生成分析报告"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # 各文件的平均信息密度只构建一次数组，图表和摘要报告共用
+        densities = self._density_array(results)
+        
         # 1. 生成Excel报告
         self.generate_excel_report(results, output_dir, timestamp)
         
         # 2. 生成可视化图表
-        self.generate_visualizations(results, output_dir, timestamp)
+        self.generate_visualizations(results, output_dir, timestamp, densities)
         
         # 3. 生成JSON详细报告
         self.generate_json_report(results, failed_files, output_dir, timestamp)
         
         # 4. 生成文本摘要报告
-        self.generate_summary_report(results, failed_files, output_dir, timestamp)
+        self.generate_summary_report(results, failed_files, output_dir, timestamp, densities)
+
+    @staticmethod
+    def _density_array(results):
+        """返回分析成功的文件的平均信息密度数组（与过滤后的结果顺序一致）"""
+        valid_results = [r for r in results if 'error' not in r]
+        return np.fromiter((r['average_density'] for r in valid_results),
+                           dtype=np.float64, count=len(valid_results))
 
     def generate_excel_report(self, results, output_dir, timestamp):
         """生成Excel报告"""
         try:
-            # 主要指标汇总
-            summary_data = []
-            for result in results:
-                if 'error' not in result:
-                    summary_data.append({
-                        '文件名': result['filename'],
-                        '总句数': result['total_sentences'],
-                        '总字数': result['total_chars'],
-                        '平均信息密度': round(result['average_density'], 4),
-                        '高质量句子占比': f"{result['high_quality_ratio']:.2%}",
-                        '高质量句子数': result['quality_distribution']['高'],
-                        '中质量句子数': result['quality_distribution']['中'],
-                        '低质量句子数': result['quality_distribution']['低'],
-                        '数字信息数量': result['content_stats']['numbers_count'],
-                        '时间词数量': result['content_stats']['time_words_count'],
-                        '平均句长': round(result['content_stats']['avg_sentence_length'], 1)
-                    })
-            
-            df_summary = pd.DataFrame(summary_data)
-            
-            # 详细句子分析
-            detail_data = []
-            for result in results:
-                if 'error' not in result:
-                    for sentence in result['sentences']:
-                        detail_data.append({
-                            '文件名': result['filename'],
-                            '句子内容': sentence['sentence'],
-                            '信息密度': round(sentence['density'], 4),
-                            '质量等级': sentence['quality'],
-                            '字数': sentence['total_chars'],
-                            '数字数量': sentence['numbers'],
-                            '时间词数量': sentence['time_words'],
-                            '专业术语数量': sentence['professional_terms']
-                        })
-            
-            df_detail = pd.DataFrame(detail_data)
+            valid_results = [r for r in results if 'error' not in r]
             
-            # 保存到Excel
+            # 直接用xlsxwriter逐行写出，不经过pandas DataFrame；
+            # constant_memory 模式不在内存中缓存整个工作簿，单元格内容一律按普通文本写入
             excel_path = os.path.join(output_dir, f"PDF分析报告_{timestamp}.xlsx")
-            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                df_summary.to_excel(writer, sheet_name='文件汇总', index=False)
-                df_detail.to_excel(writer, sheet_name='句子详情', index=False)
+            workbook = xlsxwriter.Workbook(excel_path, {
+                'constant_memory': True,
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            })
+            try:
+                header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+                
+                # 主要指标汇总
+                summary_sheet = workbook.add_worksheet('文件汇总')
+                summary_sheet.write_row(0, 0, SUMMARY_HEADERS, header_format)
+                for row, result in enumerate(valid_results, 1):
+                    quality_distribution = result['quality_distribution']
+                    content_stats = result['content_stats']
+                    summary_sheet.write_row(row, 0, (
+                        result['filename'],
+                        result['total_sentences'],
+                        result['total_chars'],
+                        round(result['average_density'], 4),
+                        f"{result['high_quality_ratio']:.2%}",
+                        quality_distribution['高'],
+                        quality_distribution['中'],
+                        quality_distribution['低'],
+                        content_stats['numbers_count'],
+                        content_stats['time_words_count'],
+                        round(content_stats['avg_sentence_length'], 1),
+                    ))
+                
+                # 详细句子分析
+                detail_sheet = workbook.add_worksheet('句子详情')
+                detail_sheet.write_row(0, 0, DETAIL_HEADERS, header_format)
+                row = 0
+                for result in valid_results:
+                    for sentence in result['sentences']:
+                        row += 1
+                        detail_sheet.write_row(row, 0, (
+                            result['filename'],
+                            sentence['sentence'],
+                            round(sentence['density'], 4),
+                            sentence['quality'],
+                            sentence['total_chars'],
+                            sentence['numbers'],
+                            sentence['time_words'],
+                            sentence['professional_terms'],
+                        ))
+            finally:
+                workbook.close()
             
             print(f"Excel报告已生成: {excel_path}")
             
         except Exception as e:
             print(f"生成Excel报告失败: {str(e)}")
 
-    def generate_visualizations(self, results, output_dir, timestamp):
+    def generate_visualizations(self, results, output_dir, timestamp, densities=None):
         """生成可视化图表"""
         try:
+            # 只在生成图表时才导入matplotlib，分析用的子进程无需加载
+            import matplotlib.pyplot as plt
+            
             valid_results = [r for r in results if 'error' not in r]
             if not valid_results:
                 return
+            if densities is None:
+                densities = self._density_array(results)
             
             # 设置图表样式
             plt.style.use('default')
+            # 设置中文字体（放在 style.use 之后，否则会被默认样式覆盖）
+            plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS']
+            plt.rcParams['axes.unicode_minus'] = False
             fig, axes = plt.subplots(2, 2, figsize=(15, 12))
             fig.suptitle('PDF文件信息密度分析报告', fontsize=16, fontweight='bold')
             
             # 1. 信息密度分布直方图
-            densities = [r['average_density'] for r in valid_results]
             axes[0, 0].hist(densities, bins=20, alpha=0.7, color='skyblue', edgecolor='black')
             axes[0, 0].set_title('信息密度分布')
             axes[0, 0].set_xlabel('平均信息密度')
             axes[0, 0].set_ylabel('文件数量')
-            axes[0, 0].axvline(x=0.15, color='red', linestyle='--', label='高质量阈值(0.15)')
-            axes[0, 0].axvline(x=0.08, color='orange', linestyle='--', label='中质量阈值(0.08)')
+            axes[0, 0].axvline(x=HIGH_DENSITY_THRESHOLD, color='red', linestyle='--',
+                               label=f'高质量阈值({HIGH_DENSITY_THRESHOLD})')
+            axes[0, 0].axvline(x=MEDIUM_DENSITY_THRESHOLD, color='orange', linestyle='--',
+                               label=f'中质量阈值({MEDIUM_DENSITY_THRESHOLD})')
             axes[0, 0].legend()
             
             # 2. 质量等级分布饼图
@@ -368,14 +562,12 @@ class PDFInfoDensityAnalyzer:
                           autopct='%1.1f%%', colors=colors)
             axes[0, 1].set_title('整体句子质量分布')
             
-            # 3. 文件质量排名
-            sorted_results = sorted(valid_results, key=lambda x: x['average_density'], reverse=True)
-            top_10 = sorted_results[:10]
-            filenames = [r['filename'][:15] + '...' if len(r['filename']) > 15 else r['filename'] 
-                        for r in top_10]
-            densities = [r['average_density'] for r in top_10]
+            # 3. 文件质量排名（稳定排序，密度相同时保持原有顺序）
+            top_order = np.argsort(-densities, kind='stable')[:10]
+            filenames = [valid_results[i]['filename'][:15] + '...' if len(valid_results[i]['filename']) > 15
+                         else valid_results[i]['filename'] for i in top_order]
             
-            bars = axes[1, 0].barh(range(len(filenames)), densities, color='lightgreen')
+            bars = axes[1, 0].barh(range(len(filenames)), densities[top_order], color='lightgreen')
             axes[1, 0].set_yticks(range(len(filenames)))
             axes[1, 0].set_yticklabels(filenames)
             axes[1, 0].set_xlabel('平均信息密度')
@@ -428,18 +620,20 @@ class PDFInfoDensityAnalyzer:
             }
             
             json_path = os.path.join(output_dir, f"详细报告_{timestamp}.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, ensure_ascii=False, indent=2)
+            with open(json_path, 'wb') as f:
+                f.write(_dumps_json(report_data))
             
             print(f"JSON详细报告已生成: {json_path}")
             
         except Exception as e:
             print(f"生成JSON报告失败: {str(e)}")
 
-    def generate_summary_report(self, results, failed_files, output_dir, timestamp):
+    def generate_summary_report(self, results, failed_files, output_dir, timestamp, densities=None):
         """生成文本摘要报告"""
         try:
             valid_results = [r for r in results if 'error' not in r]
+            if densities is None:
+                densities = self._density_array(results)
             
             report_lines = [
                 "=" * 60,
@@ -457,7 +651,7 @@ class PDFInfoDensityAnalyzer:
             if valid_results:
                 total_sentences = sum(r['total_sentences'] for r in valid_results)
                 total_chars = sum(r['total_chars'] for r in valid_results)
-                avg_density = sum(r['average_density'] for r in valid_results) / len(valid_results)
+                avg_density = densities.mean()
                 
                 high_quality_sentences = sum(r['quality_distribution']['高'] for r in valid_results)
                 high_quality_ratio = high_quality_sentences / total_sentences if total_sentences > 0 else 0
@@ -473,9 +667,9 @@ class PDFInfoDensityAnalyzer:
                     "-" * 30
                 ])
                 
-                # 排序并显示前10名
-                sorted_results = sorted(valid_results, key=lambda x: x['average_density'], reverse=True)
-                for i, result in enumerate(sorted_results[:10], 1):
+                # 排序并显示前10名（稳定排序，密度相同时保持原有顺序）
+                top_order = np.argsort(-densities, kind='stable')[:10]
+                for i, result in enumerate((valid_results[j] for j in top_order), 1):
                     report_lines.append(
                         f"{i:2d}. {result['filename']:<30} "
                         f"密度: {result['average_density']:.4f} "
@@ -535,7 +729,8 @@ def main():
     # 检查依赖
     if not PDF_AVAILABLE:
         print("请先安装必要的库:")
-        print("pip install PyPDF2 pdfplumber pandas matplotlib seaborn jieba openpyxl")
+        print("pip install PyPDF2 pdfplumber matplotlib jieba XlsxWriter")
+        print("(可选) pip install PyMuPDF  # 更快的PDF文本提取")
         return
     
     # 获取用户输入
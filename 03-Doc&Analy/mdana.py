@@ -1,23 +1,168 @@
 import os
 import re
+import hashlib
+import heapq
+import importlib.util
+import io
+import sys
 import jieba
-import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import Counter, defaultdict
+from collections import Counter
 import json
-import markdown
-from bs4 import BeautifulSoup
 import yaml
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
+try:
+    import orjson  # 可选，序列化速度远快于标准库json
+except ImportError:
+    orjson = None
+
+def _write_json(obj, f, pretty=False):
+    """
+    将对象序列化为保留中文的UTF-8 JSON，写入以二进制模式打开的文件 f
+    
+    默认紧凑输出，pretty 为 True 时缩进2格；
+    Front Matter 中的日期等非JSON类型：orjson 原生支持日期，
+    其余类型（如 !!set、!!binary）两种实现都转为字符串
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        f.write(orjson.dumps(obj, default=str, option=option))
+        return
+    # 标准库回退时逐块编码写出，不在内存中生成完整的JSON字符串
+    if pretty:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2, default=str)
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+    for chunk in encoder.iterencode(obj):
+        f.write(chunk.encode('utf-8'))
+
+# 句子质量等级的信息密度阈值（Markdown文档阈值稍低）
+HIGH_DENSITY_THRESHOLD = 0.12
+MEDIUM_DENSITY_THRESHOLD = 0.06
+# 结构化程度超过该值的文档视为结构化良好
+HIGH_STRUCTURE_THRESHOLD = 0.3
+# 质量分档的密度分界点，np.searchsorted 后 0/1/2 依次对应 低/中/高
+_QUALITY_BINS = np.array([MEDIUM_DENSITY_THRESHOLD, HIGH_DENSITY_THRESHOLD])
+
+# Excel报告的表头
+SUMMARY_HEADERS = (
+    '文件名', '总句数', '总字数', '平均信息密度', '高质量句子占比', '高质量句子数',
+    '中质量句子数', '低质量句子数', '标题数量', '代码块数量', '链接数量', '列表项数量',
+    '图片数量', '结构化程度', '代码密度', '专业术语数量', '数字信息数量', '时间词数量'
+)
+STRUCTURE_HEADERS = (
+    '文件名', '总行数', '内容行数', '空行数', '标题分布', '代码块', '内联代码',
+    '表格数量', '引用数量', '强调文本'
+)
+DETAIL_HEADERS = (
+    '文件名', '句子内容', '信息密度', '质量等级', '字数', '数字数量', '时间词数量',
+    '专业术语数量', '代码片段数量', '链接数量', '是否标题', '是否列表项'
+)
+
+# 摘要报告的首尾分隔线和各小节标题下的分隔线
+_SEP_EQ = "=" * 70
+_SEP_DASH = "-" * 40
+
+# 各文件的数值指标按列存放，每个文件一行，绘图和全局统计共用
+CHART_DTYPE = np.dtype([
+    ('density', 'f8'),        # 平均信息密度
+    ('structure', 'f8'),      # 结构化程度
+    ('code_density', 'f8'),   # 代码密度
+    ('length', 'i8'),         # 文档长度（字符数）
+    ('hq_ratio', 'f8'),       # 高质量句子占比
+    ('complexity', 'f8'),     # 结构复杂度得分
+    ('sentences', 'i8'),      # 句子数
+    ('headings', 'i8'),       # 标题数
+    ('code_blocks', 'i8'),    # 代码块数
+    ('links', 'i8'),          # 链接数
+    ('images', 'i8'),         # 图片数
+    ('terms', 'i8'),          # 专业术语数
+    ('numbers', 'i8'),        # 数字数
+    ('time_words', 'i8'),     # 时间词数
+    ('sentence_length', 'f8'),  # 平均句子长度
+    ('high', 'i8'),           # 高质量句子数
+    ('medium', 'i8'),         # 中质量句子数
+    ('low', 'i8'),            # 低质量句子数
+])
+
+# 并行分析Markdown文件的进程数
+MAX_WORKERS = os.cpu_count() or 1
+
+# 分词结果缓存的最大条数
+CUT_CACHE_SIZE = 100_000
+# 整篇文档分析结果缓存的最大条数
+CONTENT_CACHE_SIZE = 10_000
+# 分析必需的依赖：(模块名, pip安装包名)
+REQUIRED_PACKAGES = (
+    ('jieba', 'jieba'),
+    ('yaml', 'PyYAML'),
+)
+# 只有生成对应报告时才导入的依赖：(模块名, pip安装包名, 报告名称)，缺失时跳过该报告
+REPORT_PACKAGES = (
+    ('xlsxwriter', 'XlsxWriter', 'Excel报告'),
+    ('matplotlib', 'matplotlib', '可视化图表'),
+)
+# 写出JSON/文本报告时的文件缓冲区大小，减少分块写入时的系统调用次数
+REPORT_BUFFER_SIZE = 256 * 1024
+
+def _import_pyplot():
+    """只在生成图表时才导入matplotlib（分析用的子进程无需加载），并设置中文字体"""
+    import matplotlib
+    # 图表只保存为文件，使用无界面的Agg后端，不加载GUI工具包
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+# 每个子进程各自持有一个分析器，由进程池的 initializer 设置，处理各个文件时复用
+_ANALYZER = None
+
+def _get_analyzer():
+    """返回当前进程的分析器，未经 initializer 设置时按默认配置创建一次"""
+    global _ANALYZER
+    if _ANALYZER is None:
+        _ANALYZER = MarkdownInfoDensityAnalyzer()
+    return _ANALYZER
+
+def _init_worker(analyzer):
+    """子进程初始化：保存主进程传来的分析器（每个进程只反序列化一次）"""
+    global _ANALYZER
+    _ANALYZER = analyzer
+    # 提前加载jieba词典，避免每个进程在第一个句子上才延迟初始化
+    jieba.initialize()
+
+def _analyze_one(file_path, filename):
+    """在子进程中解析并分析单个Markdown文件，返回 (分析结果, 错误信息)"""
+    analyzer = _get_analyzer()
+    content, front_matter, error = analyzer.parse_markdown_file(file_path)
+    if error:
+        return None, error
+    
+    # 分析内容
+    result = analyzer.analyze_markdown_content(content, filename)
+    
+    # 添加Front Matter信息
+    result['front_matter'] = front_matter
+    result['file_path'] = file_path
+    return result, None
 
 class MarkdownInfoDensityAnalyzer:
-    def __init__(self):
-        """初始化分析器"""
+    def __init__(self, pretty_json=False, quiet=False):
+        """
+        初始化分析器
+        
+        Args:
+            pretty_json: JSON详细报告是否缩进输出，默认紧凑输出以减小文件体积
+            quiet: 是否不在控制台打印摘要报告全文（输出被重定向时本来就不打印）
+        """
+        self.pretty_json = pretty_json
+        self.quiet = quiet
+        
         # 信息价值权重
         self.weights = {
             'number': 3.0,      # 数字信息
@@ -61,50 +206,133 @@ class MarkdownInfoDensityAnalyzer:
             '缓存', '索引', '优化', '性能', '安全', '加密', '认证', '授权'
         ]
         
-        # Markdown特殊模式
+        # Markdown特殊模式（预编译，避免每次调用都查找正则缓存）
         self.md_patterns = {
-            'code_block': r'```[\s\S]*?```',
-            'inline_code': r'`[^`]+`',  # 不需要捕获组，直接移除
-            'link': r'\[([^\]]+)\]\([^\)]+\)',
-            'image': r'!\[([^\]]*)\]\([^\)]+\)',
-            'heading': r'^#{1,6}\s+(.+)$',
-            'list_item': r'^[\s]*[-*+]\s+(.+)$',
-            'numbered_list': r'^[\s]*\d+\.\s+(.+)$',
-            'blockquote': r'^>\s+(.+)$',
-            'table_row': r'\|.*\|',
-            'bold': r'\*\*([^*]+)\*\*',
-            'italic': r'\*([^*]+)\*',
-            'strikethrough': r'~~([^~]+)~~'
+            'code_block': re.compile(r'```[\s\S]*?```', re.DOTALL),
+            'inline_code': re.compile(r'`[^`]+`'),  # 不需要捕获组，直接移除
+            'link': re.compile(r'\[([^\]]+)\]\([^\)]+\)'),
+            'image': re.compile(r'!\[([^\]]*)\]\([^\)]+\)'),
+            'heading': re.compile(r'^(#{1,6})\s+(.+)$', re.MULTILINE),  # (标题标记, 标题文本)
+            'list_item': re.compile(r'^[\s]*[-*+]\s+(.+)$', re.MULTILINE),
+            'numbered_list': re.compile(r'^[\s]*\d+\.\s+(.+)$', re.MULTILINE),
+            'blockquote': re.compile(r'^>\s+(.+)$', re.MULTILINE),
+            'table_row': re.compile(r'\|.*\|'),
+            'bold': re.compile(r'\*\*([^*]+)\*\*'),
+            'italic': re.compile(r'\*([^*]+)\*'),
+            'strikethrough': re.compile(r'~~([^~]+)~~')
         }
+        
+        # 清理文本、分句和句子分析用到的其他正则
+        self._re_heading_marker = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+        self._re_list_marker = re.compile(r'^[\s]*[-*+]\s+', re.MULTILINE)
+        self._re_numbered_marker = re.compile(r'^[\s]*\d+\.\s+', re.MULTILINE)
+        self._re_blockquote_marker = re.compile(r'^>\s+', re.MULTILINE)
+        self._re_table_separator = re.compile(r'^[-\s|:]+$', re.MULTILINE)
+        self._re_blank_lines = re.compile(r'\n\s*\n')
+        self._re_spaces = re.compile(r'[ \t]+')
+        self._re_sentence_split = re.compile(r'[。！？\.\!\?]+')
+        self._re_number = re.compile(r'\d+\.?\d*')
+        # 清理Markdown文本的替换步骤，按顺序执行: (触发字符串, 正则, 替换内容)
+        # 前面的替换会产生后面步骤的匹配（如删除标题标记后露出列表标记），不能合并成一次替换；
+        # 文本中不含任何触发字符串时该步骤不可能匹配，直接跳过这次全文扫描
+        patterns = self.md_patterns
+        self._clean_steps = [
+            (('```',), patterns['code_block'], ''),             # 移除代码块
+            (('`',), patterns['inline_code'], ''),              # 移除内联代码（直接移除，不保留内容）
+            (('](',), patterns['link'], r'\1'),                 # 处理链接，保留链接文本
+            (('![',), patterns['image'], ''),                   # 移除图片
+            (('#',), self._re_heading_marker, ''),              # 清理标题标记
+            (('-', '*', '+'), self._re_list_marker, ''),        # 清理列表标记
+            (('.',), self._re_numbered_marker, ''),
+            (('>',), self._re_blockquote_marker, ''),           # 清理引用标记
+            (('**',), patterns['bold'], r'\1'),                 # 清理强调标记
+            (('*',), patterns['italic'], r'\1'),
+            (('~~',), patterns['strikethrough'], r'\1'),
+            (('|',), patterns['table_row'], ''),                # 清理表格
+            (None, self._re_table_separator, ''),               # 也会清除只含空白的行，不能跳过
+            (None, self._re_blank_lines, '\n\n'),               # 清理多余空白
+            (None, self._re_spaces, ' ')
+        ]
+        
+        # 列表项、引用标记到其后正文的位置（零宽匹配，标记后的空白跨行时也不会漏掉后续行）
+        self._re_list_context = re.compile(r'^(?=([\s]*[-*+]\s+))', re.MULTILINE)
+        self._re_blockquote_context = re.compile(r'^(?=(>\s+))', re.MULTILINE)
+        
+        # 句子 -> 分词结果，页眉页脚、模板段落等重复出现的句子不必重新分词
+        self._cut_cache = {}
+        # 正文内容摘要 -> 分析结果，README副本、生成的索引页等内容完全相同的文件只分析一次
+        self._content_cache = {}
+        self._build_lookups()
+
+    def __getstate__(self):
+        """传给子进程时只带配置和预编译的正则，不带分词和词语分类缓存"""
+        state = self.__dict__.copy()
+        state['_cut_cache'] = {}
+        state['_content_cache'] = {}
+        state['_word_categories'] = {}
+        return state
+
+    def _build_lookups(self):
+        """根据词汇库构建查找结构，并清空依赖它们的词语分类缓存"""
+        # 整词匹配用集合，时间词是子串匹配，合并为一个正则
+        self._time_re = re.compile('|'.join(map(re.escape, self.time_keywords)))
+        self._prof_set = frozenset(self.professional_terms)
+        self._conj_set = frozenset(self.conjunction_keywords)
+        self._mod_set = frozenset(self.modifier_keywords)
+        # 词语 -> 各类别标记 (时间词, 专业术语, 连接词, 修饰词, 实体)，
+        # 同一个词在整批文档中反复出现，只需判断一次
+        self._word_categories = {}
+
+    def _classify_word(self, word):
+        """判断一个词属于哪些类别，返回由0/1组成的元组"""
+        return (
+            1 if self._time_re.search(word) else 0,
+            1 if word in self._prof_set else 0,
+            1 if word in self._conj_set else 0,
+            1 if word in self._mod_set else 0,
+            1 if len(word) > 1 and word.isalpha() else 0,
+        )
 
     def parse_markdown_file(self, file_path):
-        """解析Markdown文件"""
+        """
+        解析Markdown文件
+        
+        以二进制一次性读入后再解码，无法按UTF-8解码的字节替换为占位符，
+        混有其他编码内容的文件仍然可以分析，不再整个文件失败
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 分离Front Matter和正文
-            front_matter = {}
-            body_content = content
-            
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    try:
-                        front_matter = yaml.safe_load(parts[1]) or {}
-                        body_content = parts[2].strip()
-                    except:
-                        pass
-            
-            return body_content, front_matter, None
-            
-        except Exception as e:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
             return None, {}, str(e)
+        
+        content = raw.decode('utf-8', errors='replace')
+        # 去掉BOM，并与文本模式读取一样统一换行符
+        if content.startswith('\ufeff'):
+            content = content[1:]
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        
+        # 分离Front Matter和正文
+        front_matter = {}
+        body_content = content
+        
+        if content.startswith('---'):
+            parts = content.split('---', 2)
+            if len(parts) >= 3:
+                try:
+                    front_matter = yaml.safe_load(parts[1]) or {}
+                    body_content = parts[2].strip()
+                except:
+                    pass
+        
+        return body_content, front_matter, None
 
     def extract_markdown_elements(self, content):
         """提取Markdown元素"""
         elements = {
             'headings': [],
+            'headings_with_level': [],
             'code_blocks': [],
             'inline_codes': [],
             'links': [],
@@ -116,84 +344,78 @@ class MarkdownInfoDensityAnalyzer:
         }
         
         # 提取各种元素
-        elements['headings'] = re.findall(self.md_patterns['heading'], content, re.MULTILINE)
-        elements['code_blocks'] = re.findall(self.md_patterns['code_block'], content, re.DOTALL)
-        elements['inline_codes'] = re.findall(self.md_patterns['inline_code'], content)
-        elements['links'] = re.findall(self.md_patterns['link'], content)
-        elements['images'] = re.findall(self.md_patterns['image'], content)
-        elements['list_items'] = re.findall(self.md_patterns['list_item'], content, re.MULTILINE)
-        elements['list_items'].extend(re.findall(self.md_patterns['numbered_list'], content, re.MULTILINE))
-        elements['blockquotes'] = re.findall(self.md_patterns['blockquote'], content, re.MULTILINE)
-        elements['tables'] = re.findall(self.md_patterns['table_row'], content, re.MULTILINE)
+        patterns = self.md_patterns
+        elements['headings_with_level'] = [(len(level), text) for level, text in patterns['heading'].findall(content)]
+        elements['headings'] = [text for _, text in elements['headings_with_level']]
+        elements['code_blocks'] = patterns['code_block'].findall(content)
+        elements['inline_codes'] = patterns['inline_code'].findall(content)
+        elements['links'] = patterns['link'].findall(content)
+        elements['images'] = patterns['image'].findall(content)
+        elements['list_items'] = patterns['list_item'].findall(content)
+        elements['list_items'].extend(patterns['numbered_list'].findall(content))
+        elements['blockquotes'] = patterns['blockquote'].findall(content)
+        elements['tables'] = patterns['table_row'].findall(content)
         
         # 提取强调文本
-        elements['emphasis'].extend(re.findall(self.md_patterns['bold'], content))
-        elements['emphasis'].extend(re.findall(self.md_patterns['italic'], content))
+        elements['emphasis'].extend(patterns['bold'].findall(content))
+        elements['emphasis'].extend(patterns['italic'].findall(content))
         
         return elements
 
     def clean_markdown_text(self, content):
         """清理Markdown文本，保留纯文本"""
-        # 移除代码块
-        content = re.sub(self.md_patterns['code_block'], '', content, flags=re.DOTALL)
-        
-        # 移除内联代码（修复：直接移除，不保留内容）
-        content = re.sub(self.md_patterns['inline_code'], '', content)
-        
-        # 处理链接，保留链接文本
-        content = re.sub(self.md_patterns['link'], r'\1', content)
-        
-        # 移除图片
-        content = re.sub(self.md_patterns['image'], '', content)
-        
-        # 清理标题标记
-        content = re.sub(r'^#{1,6}\s+', '', content, flags=re.MULTILINE)
-        
-        # 清理列表标记
-        content = re.sub(r'^[\s]*[-*+]\s+', '', content, flags=re.MULTILINE)
-        content = re.sub(r'^[\s]*\d+\.\s+', '', content, flags=re.MULTILINE)
-        
-        # 清理引用标记
-        content = re.sub(r'^>\s+', '', content, flags=re.MULTILINE)
-        
-        # 清理强调标记
-        content = re.sub(r'\*\*([^*]+)\*\*', r'\1', content)
-        content = re.sub(r'\*([^*]+)\*', r'\1', content)
-        content = re.sub(r'~~([^~]+)~~', r'\1', content)
-        
-        # 清理表格
-        content = re.sub(r'\|.*\|', '', content)
-        content = re.sub(r'^[-\s|:]+$', '', content, flags=re.MULTILINE)
-        
-        # 清理多余空白
-        content = re.sub(r'\n\s*\n', '\n\n', content)
-        content = re.sub(r'[ \t]+', ' ', content)
+        for triggers, pattern, repl in self._clean_steps:
+            if triggers is None or any(trigger in content for trigger in triggers):
+                content = pattern.sub(repl, content)
         
         return content.strip()
 
 
+    def _cut(self, sentence):
+        """分词，优先使用缓存，缓存超过 CUT_CACHE_SIZE 时清空重建"""
+        words = self._cut_cache.get(sentence)
+        if words is None:
+            if len(self._cut_cache) >= CUT_CACHE_SIZE:
+                self._cut_cache.clear()
+            words = self._cut_cache[sentence] = tuple(jieba.lcut(sentence))
+        return words
+
     def analyze_sentence(self, sentence, context=None):
         """分析单句信息密度"""
         if not sentence.strip():
             return None
         
         # 分词
-        words = jieba.lcut(sentence)
+        words = self._cut(sentence)
         total_chars = len(sentence.replace(' ', ''))
         
         if total_chars == 0:
             return None
         
-        # 统计各类信息
+        # 统计各类信息：遍历一次分词结果，每个词只查一次分类缓存
+        word_categories = self._word_categories
+        classify_word = self._classify_word
+        n_time = n_prof = n_conj = n_mod = n_ent = 0
+        for word in words:
+            flags = word_categories.get(word)
+            if flags is None:
+                flags = word_categories[word] = classify_word(word)
+            n_time += flags[0]
+            n_prof += flags[1]
+            n_conj += flags[2]
+            n_mod += flags[3]
+            n_ent += flags[4]
+        
         stats = {
-            'numbers': len(re.findall(r'\d+\.?\d*', sentence)),
-            'time_words': sum(1 for word in words if any(t in word for t in self.time_keywords)),
-            'professional_terms': sum(1 for word in words if word in self.professional_terms),
-            'conjunctions': sum(1 for word in words if word in self.conjunction_keywords),
-            'modifiers': sum(1 for word in words if word in self.modifier_keywords),
-            'entities': len([w for w in words if len(w) > 1 and w.isalpha()]),
-            'code_snippets': len(re.findall(r'`[^`]+`', sentence)),
-            'links': len(re.findall(r'\[([^\]]+)\]\([^\)]+\)', sentence))
+            'numbers': len(self._re_number.findall(sentence)),
+            'time_words': n_time,
+            'professional_terms': n_prof,
+            'conjunctions': n_conj,
+            'modifiers': n_mod,
+            'entities': n_ent,
+            # 清理后的句子里很少还有代码和链接标记，先用子串查找判断，不含标记时跳过正则
+            'code_snippets': len(self.md_patterns['inline_code'].findall(sentence)) if '`' in sentence else 0,
+            'links': len(self.md_patterns['link'].findall(sentence)) if '](' in sentence else 0
         }
         
         # 上下文加分
@@ -220,9 +442,9 @@ class MarkdownInfoDensityAnalyzer:
         density = info_score / total_chars if total_chars > 0 else 0
         
         # 质量等级（针对Markdown调整阈值）
-        if density > 0.12:  # Markdown文档阈值稍低
+        if density > HIGH_DENSITY_THRESHOLD:
             quality = "高"
-        elif density > 0.06:
+        elif density > MEDIUM_DENSITY_THRESHOLD:
             quality = "中"
         else:
             quality = "低"
@@ -237,8 +459,31 @@ class MarkdownInfoDensityAnalyzer:
             **stats
         }
 
+    def clear_cache(self):
+        """清空文档分析结果缓存，并按当前词汇库重建查找结构（修改权重或词汇库后调用）"""
+        self._content_cache.clear()
+        self._build_lookups()
+
     def analyze_markdown_content(self, content, filename=""):
-        """分析Markdown内容"""
+        """
+        分析Markdown内容
+        
+        按正文内容的摘要缓存分析结果，内容相同的文件直接复用，只替换文件名；
+        同时记录不含目录的文件名，供各报告直接使用
+        """
+        if not content:
+            result = self._analyze_markdown_content(content, filename)
+        else:
+            key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+            result = self._content_cache.get(key)
+            if result is None:
+                if len(self._content_cache) >= CONTENT_CACHE_SIZE:
+                    self._content_cache.clear()
+                result = self._content_cache[key] = self._analyze_markdown_content(content, filename)
+        return {**result, 'filename': filename, 'basename': os.path.basename(filename)}
+
+    def _analyze_markdown_content(self, content, filename):
+        """分析Markdown内容（不经过缓存）"""
         if not content:
             return {
                 'filename': filename,
@@ -257,8 +502,8 @@ class MarkdownInfoDensityAnalyzer:
         clean_text = self.clean_markdown_text(content)
         
         # 分句分析
-        sentences = re.split(r'[。！？\.\!\?]+', clean_text)
-        sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 3]
+        # 每个片段只strip一次；长度大于3的片段必然非空
+        sentences = [s for s in map(str.strip, self._re_sentence_split.split(clean_text)) if len(s) > 3]
         
         if not sentences:
             return {
@@ -271,16 +516,35 @@ class MarkdownInfoDensityAnalyzer:
                 'sentences': []
             }
         
-        # 分析每个句子
-        sentence_results = []
+        # 分析每个句子，句子上下文所需的标题和列表/引用信息每个文件只提取一次
+        context_index = self.build_context_index(content, md_elements['headings_with_level'])
+        # 边分析边累加整体指标，只保留前15个句子的详细信息
+        first_sentences = []
+        densities = []
+        total_chars = 0
+        total_numbers = 0
+        total_time_words = 0
+        total_professional_terms = 0
+        total_code_snippets = 0
+        total_links = 0
         for sentence in sentences:
             # 判断句子上下文
-            context = self.get_sentence_context(sentence, content)
+            context = self.get_sentence_context(sentence, context_index)
             result = self.analyze_sentence(sentence, context)
-            if result:
-                sentence_results.append(result)
+            if not result:
+                continue
+            
+            densities.append(result['density'])
+            total_chars += result['total_chars']
+            total_numbers += result['numbers']
+            total_time_words += result['time_words']
+            total_professional_terms += result['professional_terms']
+            total_code_snippets += result['code_snippets']
+            total_links += result['links']
+            if len(first_sentences) < 15:
+                first_sentences.append(result)
         
-        if not sentence_results:
+        if not densities:
             return {
                 'filename': filename,
                 'error': '句子分析失败',
@@ -291,36 +555,70 @@ class MarkdownInfoDensityAnalyzer:
                 'sentences': []
             }
         
-        # 计算整体指标
-        densities = [r['density'] for r in sentence_results]
-        average_density = sum(densities) / len(densities)
-        high_quality_count = len([r for r in sentence_results if r['quality'] == '高'])
-        high_quality_ratio = high_quality_count / len(sentence_results)
+        # 计算整体指标，整个文档的句子一次性按密度分档计数
+        sentence_count = len(densities)
+        low, medium, high = np.bincount(
+            np.searchsorted(_QUALITY_BINS, densities), minlength=3).tolist()
         
         return {
             'filename': filename,
-            'total_sentences': len(sentence_results),
-            'total_chars': sum(r['total_chars'] for r in sentence_results),
-            'average_density': average_density,
-            'high_quality_ratio': high_quality_ratio,
+            'total_sentences': sentence_count,
+            'total_chars': total_chars,
+            'average_density': sum(densities) / sentence_count,
+            'high_quality_ratio': high / sentence_count,
             'quality_distribution': {
-                '高': len([r for r in sentence_results if r['quality'] == '高']),
-                '中': len([r for r in sentence_results if r['quality'] == '中']),
-                '低': len([r for r in sentence_results if r['quality'] == '低'])
+                '高': high,
+                '中': medium,
+                '低': low
             },
             'markdown_stats': self.calculate_markdown_stats(md_elements, content),
             'content_stats': {
-                'numbers_count': sum(r['numbers'] for r in sentence_results),
-                'time_words_count': sum(r['time_words'] for r in sentence_results),
-                'professional_terms_count': sum(r['professional_terms'] for r in sentence_results),
-                'code_snippets_count': sum(r['code_snippets'] for r in sentence_results),
-                'links_count': sum(r['links'] for r in sentence_results),
-                'avg_sentence_length': sum(r['total_chars'] for r in sentence_results) / len(sentence_results)
+                'numbers_count': total_numbers,
+                'time_words_count': total_time_words,
+                'professional_terms_count': total_professional_terms,
+                'code_snippets_count': total_code_snippets,
+                'links_count': total_links,
+                'avg_sentence_length': total_chars / sentence_count
             },
-            'sentences': sentence_results[:15]  # 保留前15个句子的详细信息
+            'sentences': first_sentences  # 保留前15个句子的详细信息
         }
 
-    def get_sentence_context(self, sentence, full_content):
+    def build_context_index(self, content, headings):
+        """
+        扫描一遍原文，建立句子上下文索引
+        
+        headings 为提取Markdown元素时得到的 (层级, 标题文本) 列表；另外记录列表项、
+        引用标记之后到行尾的区间 (起点, 行尾)，区间内的文本各自用换行符拼接，
+        之后每个句子只需做子串查找
+        """
+        
+        def marker_regions(marker_re):
+            regions = {}
+            for match in marker_re.finditer(content):
+                start = match.end(1)
+                if start not in regions:
+                    line_end = content.find('\n', start)
+                    regions[start] = line_end if line_end != -1 else len(content)
+            return list(regions.items())
+        
+        list_regions = marker_regions(self._re_list_context)
+        blockquote_regions = marker_regions(self._re_blockquote_context)
+        return {
+            'content': content,
+            'headings': headings,
+            'heading_text': '\n'.join(text for _, text in headings),
+            'list_regions': list_regions,
+            'list_text': '\n'.join(content[start:end] for start, end in list_regions),
+            'blockquote_regions': blockquote_regions,
+            'blockquote_text': '\n'.join(content[start:end] for start, end in blockquote_regions)
+        }
+
+    @staticmethod
+    def _starts_in_regions(content, prefix, regions):
+        """判断 prefix 是否在原文中某个区间内（起点到行尾之间）开始出现"""
+        return any(content.find(prefix, start, end + len(prefix)) != -1 for start, end in regions)
+
+    def get_sentence_context(self, sentence, context_index):
         """获取句子上下文信息"""
         context = {
             'is_heading': False,
@@ -329,21 +627,26 @@ class MarkdownInfoDensityAnalyzer:
             'heading_level': 0
         }
         
-        # 检查是否在标题中
-        heading_matches = re.findall(r'^(#{1,6})\s+(.+)$', full_content, re.MULTILINE)
-        for level, heading_text in heading_matches:
-            if sentence in heading_text:
-                context['is_heading'] = True
-                context['heading_level'] = len(level)
-                break
-        
-        # 检查是否在列表中
-        if re.search(r'^[\s]*[-*+]\s+.*' + re.escape(sentence[:20]), full_content, re.MULTILINE):
-            context['is_list_item'] = True
+        # 检查是否在标题中（标题文本不含换行，先在拼接文本中整体查找）
+        if sentence in context_index['heading_text']:
+            for level, heading_text in context_index['headings']:
+                if sentence in heading_text:
+                    context['is_heading'] = True
+                    context['heading_level'] = level
+                    break
         
-        # 检查是否在引用中
-        if re.search(r'^>\s+.*' + re.escape(sentence[:20]), full_content, re.MULTILINE):
-            context['is_blockquote'] = True
+        prefix = sentence[:20]
+        if '\n' not in prefix:
+            # 检查是否在列表中
+            context['is_list_item'] = prefix in context_index['list_text']
+            
+            # 检查是否在引用中
+            context['is_blockquote'] = prefix in context_index['blockquote_text']
+        else:
+            # 跨行的句子开头无法在单行文本中查找，逐个区间在原文中查找，只要从区间内开始即可
+            content = context_index['content']
+            context['is_list_item'] = self._starts_in_regions(content, prefix, context_index['list_regions'])
+            context['is_blockquote'] = self._starts_in_regions(content, prefix, context_index['blockquote_regions'])
         
         return context
 
@@ -351,31 +654,33 @@ class MarkdownInfoDensityAnalyzer:
         """计算Markdown特有统计信息"""
         lines = content.split('\n')
         
+        # 逐行扫描一遍，同时统计内容行数和表格行数
+        content_lines = 0
+        table_lines = 0
+        for line in lines:
+            stripped = line.strip()
+            if stripped:
+                content_lines += 1
+                if stripped[0] == '|':
+                    table_lines += 1
+        
         stats = {
             'headings_count': len(md_elements['headings']),
-            'heading_levels': {},
+            # 标题层级分布（提取标题时已记录层级）
+            'heading_levels': dict(Counter(f'h{level}' for level, _ in md_elements['headings_with_level'])),
             'code_blocks_count': len(md_elements['code_blocks']),
             'inline_codes_count': len(md_elements['inline_codes']),
             'links_count': len(md_elements['links']),
             'images_count': len(md_elements['images']),
             'list_items_count': len(md_elements['list_items']),
             'blockquotes_count': len(md_elements['blockquotes']),
-            'tables_count': len([line for line in lines if '|' in line and line.strip().startswith('|')]),
+            'tables_count': table_lines,
             'emphasis_count': len(md_elements['emphasis']),
             'total_lines': len(lines),
-            'empty_lines': len([line for line in lines if not line.strip()]),
-            'content_lines': len([line for line in lines if line.strip()])
+            'empty_lines': len(lines) - content_lines,
+            'content_lines': content_lines
         }
         
-        # 统计标题层级分布
-        for heading in md_elements['headings']:
-            # 从原文中找到标题的层级
-            for line in lines:
-                if heading in line and line.strip().startswith('#'):
-                    level = len(line) - len(line.lstrip('#'))
-                    stats['heading_levels'][f'h{level}'] = stats['heading_levels'].get(f'h{level}', 0) + 1
-                    break
-        
         # 计算结构化程度
         structured_elements = (stats['headings_count'] + stats['list_items_count'] + 
                              stats['tables_count'] + stats['blockquotes_count'])
@@ -414,25 +719,22 @@ class MarkdownInfoDensityAnalyzer:
         results = []
         failed_files = []
         
-        for i, file_path in enumerate(md_files, 1):
-            filename = os.path.relpath(file_path, folder_path)
-            print(f"正在处理 ({i}/{len(md_files)}): {filename}")
-            
-            # 解析文件
-            content, front_matter, error = self.parse_markdown_file(file_path)
-            
-            if error:
-                failed_files.append({'filename': filename, 'error': error})
-                continue
-            
-            # 分析内容
-            result = self.analyze_markdown_content(content, filename)
-            
-            # 添加Front Matter信息
-            result['front_matter'] = front_matter
-            result['file_path'] = file_path
-            
-            results.append(result)
+        # 各文件相互独立，分词和正则扫描都是CPU密集型，使用多进程并行处理；
+        # 结果按文件顺序返回。文件数少于CPU核数时不多开空闲进程（每个进程都要加载jieba词典）
+        filenames = [os.path.relpath(file_path, folder_path) for file_path in md_files]
+        workers = min(MAX_WORKERS, len(md_files))
+        chunksize = max(1, len(md_files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            outcomes = executor.map(_analyze_one, md_files, filenames, chunksize=chunksize)
+            for i, (filename, (result, error)) in enumerate(zip(filenames, outcomes), 1):
+                print(f"已处理 ({i}/{len(md_files)}): {filename}")
+                
+                if error:
+                    failed_files.append({'filename': filename, 'error': error})
+                    continue
+                
+                results.append(result)
         
         # 生成报告
         self.generate_reports(results, failed_files, output_dir)
@@ -445,134 +747,191 @@ class MarkdownInfoDensityAnalyzer:
         """生成分析报告"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # 1. 生成Excel报告
-        self.generate_excel_report(results, output_dir, timestamp)
-        
-        # 2. 生成可视化图表
-        self.generate_visualizations(results, output_dir, timestamp)
+        # 有效结果、各文件指标数组和全局统计只计算一次，各报告共用
+        valid_results = [r for r in results if 'error' not in r]
+        chart_data = self._chart_array(valid_results)
+        global_stats = self.calculate_global_stats(valid_results, chart_data)
         
-        # 3. 生成JSON详细报告
-        self.generate_json_report(results, failed_files, output_dir, timestamp)
+        # JSON报告只读取共享数据，在后台线程中序列化并写盘，与Excel和图表的生成重叠；
+        # 摘要报告会打印到控制台，等JSON写完后最后生成
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # 1. 生成JSON详细报告
+            json_future = executor.submit(self.generate_json_report, results, failed_files,
+                                          output_dir, timestamp, global_stats)
+            
+            # 2. 生成Excel报告
+            self.generate_excel_report(results, output_dir, timestamp)
+            
+            # 3. 生成可视化图表
+            self.generate_visualizations(results, output_dir, timestamp, chart_data)
+            
+            json_future.result()
         
         # 4. 生成文本摘要报告
-        self.generate_summary_report(results, failed_files, output_dir, timestamp)
+        self.generate_summary_report(results, failed_files, output_dir, timestamp, global_stats, chart_data)
 
     def generate_excel_report(self, results, output_dir, timestamp):
         """生成Excel报告"""
         try:
-            # 文件汇总数据
-            summary_data = []
-            for result in results:
-                if 'error' not in result:
+            import xlsxwriter
+        except ImportError:
+            print("未安装 XlsxWriter，跳过Excel报告 (pip install XlsxWriter)")
+            return
+        
+        try:
+            valid_results = [r for r in results if 'error' not in r]
+            
+            # 直接用xlsxwriter逐行写出，不经过pandas DataFrame；
+            # constant_memory 模式不在内存中缓存整个工作簿，单元格内容一律按普通文本写入
+            excel_path = os.path.join(output_dir, f"Markdown分析报告_{timestamp}.xlsx")
+            workbook = xlsxwriter.Workbook(excel_path, {
+                'constant_memory': True,
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            })
+            try:
+                header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+                
+                # 文件汇总数据
+                summary_sheet = workbook.add_worksheet('文件汇总')
+                summary_sheet.write_row(0, 0, SUMMARY_HEADERS, header_format)
+                for row, result in enumerate(valid_results, 1):
                     md_stats = result['markdown_stats']
                     content_stats = result['content_stats']
-                    
-                    summary_data.append({
-                        '文件名': result['filename'],
-                        '总句数': result['total_sentences'],
-                        '总字数': result['total_chars'],
-                        '平均信息密度': round(result['average_density'], 4),
-                        '高质量句子占比': f"{result['high_quality_ratio']:.2%}",
-                        '高质量句子数': result['quality_distribution']['高'],
-                        '中质量句子数': result['quality_distribution']['中'],
-                        '低质量句子数': result['quality_distribution']['低'],
-                        '标题数量': md_stats['headings_count'],
-                        '代码块数量': md_stats['code_blocks_count'],
-                        '链接数量': md_stats['links_count'],
-                        '列表项数量': md_stats['list_items_count'],
-                        '图片数量': md_stats['images_count'],
-                        '结构化程度': f"{md_stats['structure_ratio']:.2%}",
-                        '代码密度': f"{md_stats['code_density']:.2%}",
-                        '专业术语数量': content_stats['professional_terms_count'],
-                        '数字信息数量': content_stats['numbers_count'],
-                        '时间词数量': content_stats['time_words_count']
-                    })
-            
-            df_summary = pd.DataFrame(summary_data)
-            
-            # Markdown结构分析
-            structure_data = []
-            for result in results:
-                if 'error' not in result:
+                    quality_distribution = result['quality_distribution']
+                    summary_sheet.write_row(row, 0, (
+                        result['filename'],
+                        result['total_sentences'],
+                        result['total_chars'],
+                        round(result['average_density'], 4),
+                        f"{result['high_quality_ratio']:.2%}",
+                        quality_distribution['高'],
+                        quality_distribution['中'],
+                        quality_distribution['低'],
+                        md_stats['headings_count'],
+                        md_stats['code_blocks_count'],
+                        md_stats['links_count'],
+                        md_stats['list_items_count'],
+                        md_stats['images_count'],
+                        f"{md_stats['structure_ratio']:.2%}",
+                        f"{md_stats['code_density']:.2%}",
+                        content_stats['professional_terms_count'],
+                        content_stats['numbers_count'],
+                        content_stats['time_words_count'],
+                    ))
+                
+                # Markdown结构分析
+                structure_sheet = workbook.add_worksheet('结构分析')
+                structure_sheet.write_row(0, 0, STRUCTURE_HEADERS, header_format)
+                for row, result in enumerate(valid_results, 1):
                     md_stats = result['markdown_stats']
-                    structure_data.append({
-                        '文件名': result['filename'],
-                        '总行数': md_stats['total_lines'],
-                        '内容行数': md_stats['content_lines'],
-                        '空行数': md_stats['empty_lines'],
-                        '标题分布': str(md_stats['heading_levels']),
-                        '代码块': md_stats['code_blocks_count'],
-                        '内联代码': md_stats['inline_codes_count'],
-                        '表格数量': md_stats['tables_count'],
-                        '引用数量': md_stats['blockquotes_count'],
-                        '强调文本': md_stats['emphasis_count']
-                    })
-            
-            df_structure = pd.DataFrame(structure_data)
-            
-            # 句子详细分析
-            detail_data = []
-            for result in results:
-                if 'error' not in result:
+                    structure_sheet.write_row(row, 0, (
+                        result['filename'],
+                        md_stats['total_lines'],
+                        md_stats['content_lines'],
+                        md_stats['empty_lines'],
+                        str(md_stats['heading_levels']),
+                        md_stats['code_blocks_count'],
+                        md_stats['inline_codes_count'],
+                        md_stats['tables_count'],
+                        md_stats['blockquotes_count'],
+                        md_stats['emphasis_count'],
+                    ))
+                
+                # 句子详细分析
+                detail_sheet = workbook.add_worksheet('句子详情')
+                detail_sheet.write_row(0, 0, DETAIL_HEADERS, header_format)
+                row = 0
+                for result in valid_results:
                     for sentence in result['sentences']:
-                        detail_data.append({
-                            '文件名': result['filename'],
-                            '句子内容': sentence['sentence'],
-                            '信息密度': round(sentence['density'], 4),
-                            '质量等级': sentence['quality'],
-                            '字数': sentence['total_chars'],
-                            '数字数量': sentence['numbers'],
-                            '时间词数量': sentence['time_words'],
-                            '专业术语数量': sentence['professional_terms'],
-                            '代码片段数量': sentence['code_snippets'],
-                            '链接数量': sentence['links'],
-                            '是否标题': sentence['context'].get('is_heading', False),
-                            '是否列表项': sentence['context'].get('is_list_item', False)
-                        })
-            
-            df_detail = pd.DataFrame(detail_data)
-            
-            # 保存到Excel
-            excel_path = os.path.join(output_dir, f"Markdown分析报告_{timestamp}.xlsx")
-            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                df_summary.to_excel(writer, sheet_name='文件汇总', index=False)
-                df_structure.to_excel(writer, sheet_name='结构分析', index=False)
-                df_detail.to_excel(writer, sheet_name='句子详情', index=False)
+                        row += 1
+                        detail_sheet.write_row(row, 0, (
+                            result['filename'],
+                            sentence['sentence'],
+                            round(sentence['density'], 4),
+                            sentence['quality'],
+                            sentence['total_chars'],
+                            sentence['numbers'],
+                            sentence['time_words'],
+                            sentence['professional_terms'],
+                            sentence['code_snippets'],
+                            sentence['links'],
+                            sentence['context'].get('is_heading', False),
+                            sentence['context'].get('is_list_item', False),
+                        ))
+            finally:
+                workbook.close()
             
             print(f"Excel报告已生成: {excel_path}")
             
         except Exception as e:
             print(f"生成Excel报告失败: {str(e)}")
 
-    def generate_visualizations(self, results, output_dir, timestamp):
+    @staticmethod
+    def _structure_complexity(md_stats):
+        """计算文档结构复杂度得分"""
+        return (
+            md_stats['headings_count'] * 0.3 +
+            md_stats['code_blocks_count'] * 0.4 +
+            md_stats['tables_count'] * 0.5 +
+            md_stats['list_items_count'] * 0.2 +
+            md_stats['links_count'] * 0.1
+        ) / md_stats['content_lines'] if md_stats['content_lines'] > 0 else 0
+
+    @classmethod
+    def _chart_array(cls, valid_results):
+        """遍历一次分析结果，生成按列存放各文件指标的结构化数组（与 valid_results 顺序一致）"""
+        def row(r):
+            ms = r['markdown_stats']
+            cs = r['content_stats']
+            qd = r['quality_distribution']
+            return (r['average_density'], ms['structure_ratio'], ms['code_density'],
+                    r['total_chars'], r['high_quality_ratio'], cls._structure_complexity(ms),
+                    r['total_sentences'], ms['headings_count'], ms['code_blocks_count'],
+                    ms['links_count'], ms['images_count'], cs['professional_terms_count'],
+                    cs['numbers_count'], cs['time_words_count'], cs['avg_sentence_length'],
+                    qd['高'], qd['中'], qd['低'])
+        
+        return np.fromiter(map(row, valid_results), dtype=CHART_DTYPE, count=len(valid_results))
+
+    def generate_visualizations(self, results, output_dir, timestamp, chart_data=None):
         """生成可视化图表"""
+        try:
+            plt = _import_pyplot()
+        except ImportError:
+            print("未安装 matplotlib，跳过可视化图表 (pip install matplotlib)")
+            return
+        
         try:
             valid_results = [r for r in results if 'error' not in r]
             if not valid_results:
                 return
+            if chart_data is None:
+                chart_data = self._chart_array(valid_results)
+            densities = chart_data['density']
             
             # 创建2x3的子图布局
             fig, axes = plt.subplots(2, 3, figsize=(18, 12))
             fig.suptitle('Markdown文件信息密度分析报告', fontsize=16, fontweight='bold')
             
             # 1. 信息密度分布
-            densities = [r['average_density'] for r in valid_results]
             axes[0, 0].hist(densities, bins=20, alpha=0.7, color='lightblue', edgecolor='black')
             axes[0, 0].set_title('信息密度分布')
             axes[0, 0].set_xlabel('平均信息密度')
             axes[0, 0].set_ylabel('文件数量')
-            axes[0, 0].axvline(x=0.12, color='red', linestyle='--', label='高质量阈值')
-            axes[0, 0].axvline(x=0.06, color='orange', linestyle='--', label='中质量阈值')
+            axes[0, 0].axvline(x=HIGH_DENSITY_THRESHOLD, color='red', linestyle='--', label='高质量阈值')
+            axes[0, 0].axvline(x=MEDIUM_DENSITY_THRESHOLD, color='orange', linestyle='--', label='中质量阈值')
             axes[0, 0].legend()
             
-            # 2. Markdown元素分布
-            element_counts = {
-                '标题': sum(r['markdown_stats']['headings_count'] for r in valid_results),
-                '代码块': sum(r['markdown_stats']['code_blocks_count'] for r in valid_results),
-                '链接': sum(r['markdown_stats']['links_count'] for r in valid_results),
-                '列表': sum(r['markdown_stats']['list_items_count'] for r in valid_results),
-                '图片': sum(r['markdown_stats']['images_count'] for r in valid_results)
-            }
+            # 2. Markdown元素分布（遍历一次结果，同时累加各类元素）
+            element_counts = {'标题': 0, '代码块': 0, '链接': 0, '列表': 0, '图片': 0}
+            for r in valid_results:
+                md_stats = r['markdown_stats']
+                element_counts['标题'] += md_stats['headings_count']
+                element_counts['代码块'] += md_stats['code_blocks_count']
+                element_counts['链接'] += md_stats['links_count']
+                element_counts['列表'] += md_stats['list_items_count']
+                element_counts['图片'] += md_stats['images_count']
             
             axes[0, 1].bar(element_counts.keys(), element_counts.values(), 
                           color=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#ff99cc'])
@@ -581,10 +940,9 @@ class MarkdownInfoDensityAnalyzer:
             axes[0, 1].tick_params(axis='x', rotation=45)
             
             # 3. 质量分布饼图
-            quality_counts = {'高': 0, '中': 0, '低': 0}
-            for result in valid_results:
-                for quality, count in result['quality_distribution'].items():
-                    quality_counts[quality] += count
+            # 各等级句子数直接对结构化数组的列求和
+            quality_counts = {quality: int(chart_data[field].sum())
+                              for quality, field in (('高', 'high'), ('中', 'medium'), ('低', 'low'))}
             
             colors = ['#ff9999', '#66b3ff', '#99ff99']
             axes[0, 2].pie(quality_counts.values(), labels=quality_counts.keys(), 
@@ -592,12 +950,12 @@ class MarkdownInfoDensityAnalyzer:
             axes[0, 2].set_title('句子质量分布')
             
             # 4. 文件质量排名
-            sorted_results = sorted(valid_results, key=lambda x: x['average_density'], reverse=True)
-            top_10 = sorted_results[:10]
-            filenames = [os.path.basename(r['filename'])[:20] + '...' 
-                        if len(os.path.basename(r['filename'])) > 20 
-                        else os.path.basename(r['filename']) for r in top_10]
-            densities_top = [r['average_density'] for r in top_10]
+            # 稳定排序，密度相同时保持原有顺序
+            top_order = np.argsort(-densities, kind='stable')[:10]
+            top_10 = [valid_results[i] for i in top_order]
+            filenames = [r['basename'][:20] + '...' if len(r['basename']) > 20 else r['basename']
+                         for r in top_10]
+            densities_top = densities[top_order]
             
             bars = axes[1, 0].barh(range(len(filenames)), densities_top, color='lightgreen')
             axes[1, 0].set_yticks(range(len(filenames)))
@@ -606,15 +964,13 @@ class MarkdownInfoDensityAnalyzer:
             axes[1, 0].set_title('文件质量排名 (Top 10)')
             
             # 5. 结构化程度 vs 信息密度
-            structure_ratios = [r['markdown_stats']['structure_ratio'] for r in valid_results]
-            axes[1, 1].scatter(structure_ratios, densities, alpha=0.6, color='purple')
+            axes[1, 1].scatter(chart_data['structure'], densities, alpha=0.6, color='purple')
             axes[1, 1].set_xlabel('结构化程度')
             axes[1, 1].set_ylabel('信息密度')
             axes[1, 1].set_title('结构化程度 vs 信息密度')
             
             # 6. 代码密度分布
-            code_densities = [r['markdown_stats']['code_density'] for r in valid_results]
-            axes[1, 2].hist(code_densities, bins=15, alpha=0.7, color='orange', edgecolor='black')
+            axes[1, 2].hist(chart_data['code_density'], bins=15, alpha=0.7, color='orange', edgecolor='black')
             axes[1, 2].set_title('代码密度分布')
             axes[1, 2].set_xlabel('代码密度')
             axes[1, 2].set_ylabel('文件数量')
@@ -624,29 +980,32 @@ class MarkdownInfoDensityAnalyzer:
             # 保存图表
             chart_path = os.path.join(output_dir, f"Markdown分析图表_{timestamp}.png")
             plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
             # 生成额外的专项分析图表
-            self.generate_additional_charts(valid_results, output_dir, timestamp)
+            self.generate_additional_charts(valid_results, output_dir, timestamp, chart_data)
             
             print(f"可视化图表已生成: {chart_path}")
             
         except Exception as e:
             print(f"生成可视化图表失败: {str(e)}")
 
-    def generate_additional_charts(self, results, output_dir, timestamp):
+    def generate_additional_charts(self, results, output_dir, timestamp, chart_data=None):
         """生成额外的专项分析图表"""
         try:
+            plt = _import_pyplot()
+            
+            if chart_data is None:
+                chart_data = self._chart_array(results)
+            
             # 创建标题层级分析图
             fig, axes = plt.subplots(2, 2, figsize=(15, 10))
             fig.suptitle('Markdown文档结构深度分析', fontsize=14, fontweight='bold')
             
             # 1. 标题层级分布
-            all_heading_levels = defaultdict(int)
+            all_heading_levels = Counter()
             for result in results:
-                heading_levels = result['markdown_stats']['heading_levels']
-                for level, count in heading_levels.items():
-                    all_heading_levels[level] += count
+                all_heading_levels.update(result['markdown_stats']['heading_levels'])
             
             if all_heading_levels:
                 levels = sorted(all_heading_levels.keys())
@@ -657,50 +1016,33 @@ class MarkdownInfoDensityAnalyzer:
                 axes[0, 0].set_ylabel('数量')
             
             # 2. 文档长度 vs 质量关系
-            doc_lengths = [r['total_chars'] for r in results]
-            quality_ratios = [r['high_quality_ratio'] for r in results]
-            
-            scatter = axes[0, 1].scatter(doc_lengths, quality_ratios, 
-                                       c=[r['average_density'] for r in results], 
+            scatter = axes[0, 1].scatter(chart_data['length'], chart_data['hq_ratio'], 
+                                       c=chart_data['density'], 
                                        cmap='viridis', alpha=0.6)
             axes[0, 1].set_xlabel('文档长度（字符数）')
             axes[0, 1].set_ylabel('高质量句子占比')
             axes[0, 1].set_title('文档长度 vs 质量关系')
             plt.colorbar(scatter, ax=axes[0, 1], label='平均信息密度')
             
-            # 3. 不同元素类型的密度贡献
-            element_contributions = {
-                '数字信息': sum(r['content_stats']['numbers_count'] for r in results),
-                '专业术语': sum(r['content_stats']['professional_terms_count'] for r in results),
-                '代码片段': sum(r['content_stats']['code_snippets_count'] for r in results),
-                '链接': sum(r['content_stats']['links_count'] for r in results),
-                '时间词': sum(r['content_stats']['time_words_count'] for r in results)
-            }
+            # 3. 不同元素类型的密度贡献（遍历一次结果，同时累加各类信息）
+            element_contributions = {'数字信息': 0, '专业术语': 0, '代码片段': 0, '链接': 0, '时间词': 0}
+            for r in results:
+                content_stats = r['content_stats']
+                element_contributions['数字信息'] += content_stats['numbers_count']
+                element_contributions['专业术语'] += content_stats['professional_terms_count']
+                element_contributions['代码片段'] += content_stats['code_snippets_count']
+                element_contributions['链接'] += content_stats['links_count']
+                element_contributions['时间词'] += content_stats['time_words_count']
             
             axes[1, 0].pie(element_contributions.values(), labels=element_contributions.keys(),
                           autopct='%1.1f%%', startangle=90)
             axes[1, 0].set_title('信息密度贡献分布')
             
             # 4. 文档结构复杂度分析
-            complexity_scores = []
-            filenames = []
-            
-            for result in results:
-                md_stats = result['markdown_stats']
-                # 计算复杂度得分
-                complexity = (
-                    md_stats['headings_count'] * 0.3 +
-                    md_stats['code_blocks_count'] * 0.4 +
-                    md_stats['tables_count'] * 0.5 +
-                    md_stats['list_items_count'] * 0.2 +
-                    md_stats['links_count'] * 0.1
-                ) / md_stats['content_lines'] if md_stats['content_lines'] > 0 else 0
-                
-                complexity_scores.append(complexity)
-                filenames.append(os.path.basename(result['filename'])[:15])
+            filenames = [result['basename'][:15] for result in results]
             
             # 显示复杂度最高的10个文档
-            sorted_data = sorted(zip(complexity_scores, filenames), reverse=True)[:10]
+            sorted_data = sorted(zip(chart_data['complexity'].tolist(), filenames), reverse=True)[:10]
             if sorted_data:
                 scores, names = zip(*sorted_data)
                 y_pos = range(len(names))
@@ -715,14 +1057,16 @@ class MarkdownInfoDensityAnalyzer:
             
             additional_chart_path = os.path.join(output_dir, f"Markdown深度分析_{timestamp}.png")
             plt.savefig(additional_chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            plt.close(fig)
             
         except Exception as e:
             print(f"生成额外图表失败: {str(e)}")
 
-    def generate_json_report(self, results, failed_files, output_dir, timestamp):
+    def generate_json_report(self, results, failed_files, output_dir, timestamp, global_stats=None):
         """生成JSON详细报告"""
         try:
+            if global_stats is None:
+                global_stats = self.calculate_global_stats(results)
             report_data = {
                 'analysis_time': datetime.now().isoformat(),
                 'summary': {
@@ -732,90 +1076,113 @@ class MarkdownInfoDensityAnalyzer:
                     'analyzer_version': '1.0.0',
                     'analysis_type': 'Markdown信息密度分析'
                 },
-                'global_stats': self.calculate_global_stats(results),
+                'global_stats': global_stats,
                 'results': results,
                 'failed_files': failed_files,
                 'analysis_config': {
                     'weights': self.weights,
                     'quality_thresholds': {
-                        'high': 0.12,
-                        'medium': 0.06
+                        'high': HIGH_DENSITY_THRESHOLD,
+                        'medium': MEDIUM_DENSITY_THRESHOLD
                     }
                 }
             }
             
             json_path = os.path.join(output_dir, f"Markdown详细报告_{timestamp}.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, ensure_ascii=False, indent=2)
+            with open(json_path, 'wb', buffering=REPORT_BUFFER_SIZE) as f:
+                _write_json(report_data, f, self.pretty_json)
             
             print(f"JSON详细报告已生成: {json_path}")
             
         except Exception as e:
             print(f"生成JSON报告失败: {str(e)}")
 
-    def calculate_global_stats(self, results):
+    def calculate_global_stats(self, results, chart_data=None):
         """计算全局统计信息"""
         valid_results = [r for r in results if 'error' not in r]
         if not valid_results:
             return {}
+        if chart_data is None:
+            chart_data = self._chart_array(valid_results)
+        
+        # 各指标都是结构化数组中的一列，直接向量化求和
+        def total(field):
+            return int(chart_data[field].sum())
         
-        total_sentences = sum(r['total_sentences'] for r in valid_results)
-        total_chars = sum(r['total_chars'] for r in valid_results)
-        total_high_quality = sum(r['quality_distribution']['高'] for r in valid_results)
+        doc_count = len(valid_results)
+        total_sentences = total('sentences')
+        total_headings = total('headings')
+        total_code_blocks = total('code_blocks')
+        high_count = total('high')
         
-        # Markdown特有统计
-        total_headings = sum(r['markdown_stats']['headings_count'] for r in valid_results)
-        total_code_blocks = sum(r['markdown_stats']['code_blocks_count'] for r in valid_results)
-        total_links = sum(r['markdown_stats']['links_count'] for r in valid_results)
-        total_images = sum(r['markdown_stats']['images_count'] for r in valid_results)
+        # 标题层级的键不固定，仍需遍历各文件的字典
+        heading_distribution = Counter()
+        for r in valid_results:
+            heading_distribution.update(r['markdown_stats']['heading_levels'])
         
         return {
             'total_sentences': total_sentences,
-            'total_characters': total_chars,
-            'average_density': sum(r['average_density'] for r in valid_results) / len(valid_results),
-            'global_high_quality_ratio': total_high_quality / total_sentences if total_sentences > 0 else 0,
+            'total_characters': total('length'),
+            'average_density': float(chart_data['density'].mean()),
+            'global_high_quality_ratio': high_count / total_sentences if total_sentences > 0 else 0,
+            'quality_distribution': {'高': high_count, '中': total('medium'), '低': total('low')},
             'markdown_elements': {
                 'total_headings': total_headings,
                 'total_code_blocks': total_code_blocks,
-                'total_links': total_links,
-                'total_images': total_images,
-                'avg_headings_per_doc': total_headings / len(valid_results),
-                'avg_code_blocks_per_doc': total_code_blocks / len(valid_results)
+                'total_links': total('links'),
+                'total_images': total('images'),
+                'avg_headings_per_doc': total_headings / doc_count,
+                'avg_code_blocks_per_doc': total_code_blocks / doc_count,
+                'heading_distribution': dict(heading_distribution)
             },
             'content_analysis': {
-                'total_professional_terms': sum(r['content_stats']['professional_terms_count'] for r in valid_results),
-                'total_numbers': sum(r['content_stats']['numbers_count'] for r in valid_results),
-                'total_time_words': sum(r['content_stats']['time_words_count'] for r in valid_results),
-                'avg_sentence_length': sum(r['content_stats']['avg_sentence_length'] for r in valid_results) / len(valid_results)
+                'total_professional_terms': total('terms'),
+                'total_numbers': total('numbers'),
+                'total_time_words': total('time_words'),
+                'avg_sentence_length': float(chart_data['sentence_length'].mean())
             }
         }
 
-    def generate_summary_report(self, results, failed_files, output_dir, timestamp):
+    def generate_summary_report(self, results, failed_files, output_dir, timestamp,
+                                global_stats=None, chart_data=None):
         """生成文本摘要报告"""
         try:
             valid_results = [r for r in results if 'error' not in r]
-            global_stats = self.calculate_global_stats(results)
+            if global_stats is None:
+                global_stats = self.calculate_global_stats(results)
+            if chart_data is None:
+                chart_data = self._chart_array(valid_results)
+            densities = chart_data['density']
+            
+            # 报告内容直接写入内存缓冲区，不保留逐行列表，也不需要再拼接
+            buf = io.StringIO()
+            w = buf.write
+            
+            def write_lines(lines):
+                for line in lines:
+                    w(line)
+                    w('\n')
             
-            report_lines = [
-                "=" * 70,
+            write_lines([
+                _SEP_EQ,
                 "Markdown文件信息密度分析摘要报告",
-                "=" * 70,
+                _SEP_EQ,
                 f"分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
                 f"分析工具: Markdown信息密度分析器 v1.0.0",
                 "",
                 "📊 文件统计:",
-                "-" * 40,
+                _SEP_DASH,
                 f"总文件数: {len(results) + len(failed_files)}",
                 f"成功分析: {len(valid_results)} 个",
                 f"失败文件: {len(failed_files)} 个",
                 f"成功率: {len(valid_results)/(len(results) + len(failed_files))*100:.1f}%",
                 "",
                 "📈 整体质量指标:",
-                "-" * 40
-            ]
+                _SEP_DASH
+            ])
             
             if valid_results:
-                report_lines.extend([
+                write_lines([
                     f"总句子数: {global_stats['total_sentences']:,}",
                     f"总字符数: {global_stats['total_characters']:,}",
                     f"平均信息密度: {global_stats['average_density']:.4f}",
@@ -823,7 +1190,7 @@ class MarkdownInfoDensityAnalyzer:
                     f"平均句子长度: {global_stats['content_analysis']['avg_sentence_length']:.1f} 字符",
                     "",
                     "📝 Markdown元素统计:",
-                    "-" * 40,
+                    _SEP_DASH,
                     f"标题总数: {global_stats['markdown_elements']['total_headings']:,}",
                     f"代码块总数: {global_stats['markdown_elements']['total_code_blocks']:,}",
                     f"链接总数: {global_stats['markdown_elements']['total_links']:,}",
@@ -832,121 +1199,123 @@ class MarkdownInfoDensityAnalyzer:
                     f"平均每文档代码块数: {global_stats['markdown_elements']['avg_code_blocks_per_doc']:.1f}",
                     "",
                     "🎯 内容分析:",
-                    "-" * 40,
+                    _SEP_DASH,
                     f"专业术语总数: {global_stats['content_analysis']['total_professional_terms']:,}",
                     f"数字信息总数: {global_stats['content_analysis']['total_numbers']:,}",
                     f"时间词总数: {global_stats['content_analysis']['total_time_words']:,}",
                     "",
                     "🏆 文件质量排名 (按信息密度):",
-                    "-" * 40
+                    _SEP_DASH
                 ])
                 
-                # 排序并显示前15名
-                sorted_results = sorted(valid_results, key=lambda x: x['average_density'], reverse=True)
-                for i, result in enumerate(sorted_results[:15], 1):
-                    filename = os.path.basename(result['filename'])
-                    report_lines.append(
-                        f"{i:2d}. {filename:<35} "
-                        f"密度: {result['average_density']:.4f} "
-                        f"高质量: {result['high_quality_ratio']:.1%} "
-                        f"标题: {result['markdown_stats']['headings_count']:2d}"
-                    )
+                # 超过35个字符的文件名截断后再补齐，保证各列对齐
+                def fit_name(name):
+                    return name if len(name) <= 35 else name[:32] + '...'
+                
+                # 显示前15名，只需部分选择而不必对全部结果排序
+                # 密度相同时保持原有顺序
+                top_results = heapq.nlargest(15, valid_results, key=lambda x: x['average_density'])
+                w('\n'.join(
+                    f"{i:2d}. {fit_name(result['basename']):<35} "
+                    f"密度: {result['average_density']:.4f} "
+                    f"高质量: {result['high_quality_ratio']:.1%} "
+                    f"标题: {result['markdown_stats']['headings_count']:2d}"
+                    for i, result in enumerate(top_results, 1)
+                ))
+                w('\n')
                 
                 # 质量分布统计
-                report_lines.extend([
+                write_lines([
                     "",
                     "📊 质量分布统计:",
-                    "-" * 40
+                    _SEP_DASH
                 ])
                 
-                quality_totals = {'高': 0, '中': 0, '低': 0}
-                for result in valid_results:
-                    for quality, count in result['quality_distribution'].items():
-                        quality_totals[quality] += count
-                
+                quality_totals = global_stats['quality_distribution']
                 total_quality_sentences = sum(quality_totals.values())
                 for quality, count in quality_totals.items():
                     ratio = count / total_quality_sentences if total_quality_sentences > 0 else 0
-                    report_lines.append(f"{quality}质量句子: {count:,} ({ratio:.1%})")
+                    w(f"{quality}质量句子: {count:,} ({ratio:.1%})\n")
                 
                 # 结构分析
-                report_lines.extend([
+                write_lines([
                     "",
                     "🏗️ 文档结构分析:",
-                    "-" * 40
+                    _SEP_DASH
                 ])
                 
-                avg_structure_ratio = sum(r['markdown_stats']['structure_ratio'] for r in valid_results) / len(valid_results)
-                avg_code_density = sum(r['markdown_stats']['code_density'] for r in valid_results) / len(valid_results)
+                avg_structure_ratio = chart_data['structure'].mean()
+                avg_code_density = chart_data['code_density'].mean()
                 
-                report_lines.extend([
+                write_lines([
                     f"平均结构化程度: {avg_structure_ratio:.2%}",
                     f"平均代码密度: {avg_code_density:.2%}",
                 ])
                 
                 # 最佳实践建议
-                report_lines.extend([
+                write_lines([
                     "",
                     "💡 优化建议:",
-                    "-" * 40
+                    _SEP_DASH
                 ])
                 
-                low_quality_files = [r for r in valid_results if r['average_density'] < 0.06]
-                high_structure_files = [r for r in valid_results if r['markdown_stats']['structure_ratio'] > 0.3]
+                low_quality_count = int(np.count_nonzero(densities < MEDIUM_DENSITY_THRESHOLD))
+                high_structure_count = int(np.count_nonzero(chart_data['structure'] > HIGH_STRUCTURE_THRESHOLD))
                 
-                if low_quality_files:
-                    report_lines.append(f"• {len(low_quality_files)} 个文件信息密度较低，建议增加具体数据和专业术语")
+                if low_quality_count:
+                    w(f"• {low_quality_count} 个文件信息密度较低，建议增加具体数据和专业术语\n")
                 
-                if len(high_structure_files) / len(valid_results) < 0.5:
-                    report_lines.append("• 建议增加文档结构化元素（标题、列表、表格等）")
+                # 以下比例判断都是整数，交叉相乘后直接比较，不做除法
+                doc_count = len(valid_results)
+                if high_structure_count * 2 < doc_count:
+                    w("• 建议增加文档结构化元素（标题、列表、表格等）\n")
                 
                 if global_stats['markdown_elements']['avg_code_blocks_per_doc'] < 1:
-                    report_lines.append("• 技术文档建议增加代码示例以提高实用性")
+                    w("• 技术文档建议增加代码示例以提高实用性\n")
                 
                 # 标题层级建议
-                heading_distribution = defaultdict(int)
-                for result in valid_results:
-                    for level, count in result['markdown_stats']['heading_levels'].items():
-                        heading_distribution[level] += count
-                
-                if 'h1' in heading_distribution and heading_distribution['h1'] > len(valid_results):
-                    report_lines.append("• 建议减少一级标题使用，保持文档层次清晰")
+                heading_distribution = global_stats['markdown_elements']['heading_distribution']
+                if 'h1' in heading_distribution and heading_distribution['h1'] > doc_count:
+                    w("• 建议减少一级标题使用，保持文档层次清晰\n")
                 
-                if sum(heading_distribution.values()) / len(valid_results) < 3:
-                    report_lines.append("• 建议增加标题数量，改善文档可读性")
+                if sum(heading_distribution.values()) < doc_count * 3:
+                    w("• 建议增加标题数量，改善文档可读性\n")
             
             # 失败文件列表
             if failed_files:
-                report_lines.extend([
+                write_lines([
                     "",
                     "❌ 处理失败的文件:",
-                    "-" * 40
+                    _SEP_DASH
                 ])
                 for failed in failed_files:
-                    report_lines.append(f"- {failed['filename']}: {failed['error']}")
+                    w(f"- {failed['filename']}: {failed['error']}\n")
             
             # 技术说明
-            report_lines.extend([
+            write_lines([
                 "",
                 "🔧 技术说明:",
-                "-" * 40,
+                _SEP_DASH,
                 "• 信息密度 = 信息价值得分 / 字符数",
                 "• 高质量阈值: 0.12，中质量阈值: 0.06",
                 "• 权重设置: 数字(3.0), 时间(2.5), 代码(2.5), 专业术语(2.0)",
                 "• 结构化程度 = (标题+列表+表格+引用) / 内容行数",
                 "• 代码密度 = (代码块+内联代码) / 内容行数",
+                "• JSON详细报告默认紧凑输出，运行时加 --pretty 参数可输出缩进格式",
                 "",
-                "=" * 70,
+                _SEP_EQ,
                 "报告结束 - 感谢使用Markdown信息密度分析工具"
             ])
             
             # 保存报告
             summary_path = os.path.join(output_dir, f"Markdown摘要报告_{timestamp}.txt")
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(report_lines))
+            text = buf.getvalue()
+            with open(summary_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f:
+                f.write(text)
             
-            # 同时打印到控制台
-            print("\n" + '\n'.join(report_lines))
+            # 只有直接输出到终端时才打印全文，重定向到日志时只提示保存位置
+            if not self.quiet and sys.stdout.isatty():
+                sys.stdout.write("\n" + text)
             print(f"\n摘要报告已保存: {summary_path}")
             
         except Exception as e:
@@ -957,53 +1326,22 @@ def main():
     print("Markdown文件信息密度批量分析工具")
     print("=" * 60)
     
-    # 检查依赖
-    missing_packages = []
-    try:
-        import jieba
-    except ImportError:
-        missing_packages.append('jieba')
-    
-    try:
-        import pandas
-    except ImportError:
-        missing_packages.append('pandas')
-    
-    try:
-        import matplotlib
-    except ImportError:
-        missing_packages.append('matplotlib')
-    
-    try:
-        import seaborn
-    except ImportError:
-        missing_packages.append('seaborn')
-    
-    try:
-        import markdown
-    except ImportError:
-        missing_packages.append('markdown')
-    
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        missing_packages.append('beautifulsoup4')
-    
-    try:
-        import yaml
-    except ImportError:
-        missing_packages.append('PyYAML')
-    
-    try:
-        import openpyxl
-    except ImportError:
-        missing_packages.append('openpyxl')
-    
+    # 检查依赖：只查找模块是否存在，不执行模块的导入代码
+    missing_packages = [package for module, package in REQUIRED_PACKAGES
+                        if importlib.util.find_spec(module) is None]
     if missing_packages:
         print("请先安装必要的库:")
         print(f"pip install {' '.join(missing_packages)}")
         return
     
+    for module, package, report in REPORT_PACKAGES:
+        if importlib.util.find_spec(module) is None:
+            print(f"提示: 未安装 {package}，将跳过{report} (pip install {package})")
+    
+    # orjson 为可选依赖，缺失时JSON报告回退到标准库json
+    if orjson is None:
+        print("提示: 安装 orjson 可加快JSON报告生成 (pip install orjson)")
+    
     # 获取用户输入
     while True:
         folder_path = input("请输入Markdown文件夹路径: ").strip().strip('"')
@@ -1019,8 +1357,10 @@ def main():
     print("支持的文件扩展名: .md, .markdown, .mdown, .mkd")
     print("-" * 60)
     
-    # 创建分析器并开始分析
-    analyzer = MarkdownInfoDensityAnalyzer()
+    # 创建分析器并开始分析（命令行参数中的 --pretty 表示JSON报告缩进输出，
+    # --quiet 表示不在控制台打印摘要报告全文）
+    analyzer = MarkdownInfoDensityAnalyzer(pretty_json='--pretty' in sys.argv[1:],
+                                           quiet='--quiet' in sys.argv[1:])
     analyzer.analyze_markdown_folder(folder_path, output_dir)
 
 if __name__ == "__main__":